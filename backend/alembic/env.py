@@ -17,7 +17,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from app.database import Base
-from app.models import Domain  # noqa: F401 — ensure model is registered
+from app.models import Domain, ArchivedDomain, DomainChange, VerifyRollup, WebhookEndpoint, WebhookOutbox  # noqa: F401 — ensure models are registered
 from app.config import get_settings
 
 config = context.config
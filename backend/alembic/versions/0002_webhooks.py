@@ -0,0 +1,62 @@
+"""Webhook endpoints and delivery outbox"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_webhooks"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_endpoints",
+        sa.Column("id", sa.String(36), primary_key=True, nullable=False),
+        sa.Column("url", sa.String(2048), nullable=False),
+        sa.Column("events", sa.String(255), nullable=False, server_default="domain.revoked"),
+        sa.Column("secret", sa.String(128), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_table(
+        "webhook_outbox",
+        sa.Column("id", sa.String(36), primary_key=True, nullable=False),
+        sa.Column(
+            "endpoint_id",
+            sa.String(36),
+            sa.ForeignKey("webhook_endpoints.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("event_type", sa.String(50), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("ix_webhook_outbox_endpoint_id", "webhook_outbox", ["endpoint_id"])
+    op.create_index("ix_webhook_outbox_next_attempt_at", "webhook_outbox", ["next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_outbox_next_attempt_at", table_name="webhook_outbox")
+    op.drop_index("ix_webhook_outbox_endpoint_id", table_name="webhook_outbox")
+    op.drop_table("webhook_outbox")
+    op.drop_table("webhook_endpoints")
@@ -0,0 +1,30 @@
+"""Domain change log for cross-worker cache invalidation without LISTEN/NOTIFY"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_domain_changes"
+down_revision = "0002_webhooks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "domain_changes",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True, nullable=False),
+        sa.Column("domain_name", sa.String(255), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("ix_domain_changes_created_at", "domain_changes", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_domain_changes_created_at", table_name="domain_changes")
+    op.drop_table("domain_changes")
@@ -0,0 +1,46 @@
+"""Archive table for cold domain records; index revoked records by age"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_domains_archive"
+down_revision = "0003_domain_changes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "domains_archive",
+        sa.Column("id", sa.String(36), primary_key=True, nullable=False),
+        sa.Column("domain_name", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("compliance_level", sa.String(50), nullable=False),
+        sa.Column("issued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("signature", sa.Text(), nullable=False),
+        sa.Column("public_key", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("archive_reason", sa.String(20), nullable=False),
+    )
+    op.create_index("ix_domains_archive_domain_name", "domains_archive", ["domain_name"])
+    op.create_index(
+        "ix_domains_revoked_at",
+        "domains",
+        ["revoked_at"],
+        postgresql_where=sa.text("status = 'revoked'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_domains_revoked_at", table_name="domains")
+    op.drop_index("ix_domains_archive_domain_name", table_name="domains_archive")
+    op.drop_table("domains_archive")
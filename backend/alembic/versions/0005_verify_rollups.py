@@ -0,0 +1,27 @@
+"""Per-domain /verify traffic rollups"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_verify_rollups"
+down_revision = "0004_domains_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "verify_rollups",
+        sa.Column("domain_name", sa.String(255), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("verify_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("referrer_sketch", sa.LargeBinary(), nullable=True),
+        sa.PrimaryKeyConstraint("domain_name", "bucket_start"),
+    )
+    op.create_index("ix_verify_rollups_bucket_start", "verify_rollups", ["bucket_start"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_verify_rollups_bucket_start", table_name="verify_rollups")
+    op.drop_table("verify_rollups")
@@ -0,0 +1,27 @@
+"""Compliance expiry: expires_at on domains and the archive"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_expires_at"
+down_revision = "0005_verify_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("domains", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("domains_archive", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_domains_expires_at",
+        "domains",
+        ["expires_at"],
+        postgresql_where=sa.text("status = 'active'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_domains_expires_at", table_name="domains")
+    op.drop_column("domains_archive", "expires_at")
+    op.drop_column("domains", "expires_at")
@@ -0,0 +1,28 @@
+"""domain_changes ids must never be reused on SQLite (AUTOINCREMENT)"""
+
+from alembic import op
+
+
+revision = "0007_domain_changes_autoincrement"
+down_revision = "0006_expires_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # PostgreSQL sequences never hand out an id twice; only SQLite needs the rebuild
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table(
+        "domain_changes", recreate="always", table_kwargs={"sqlite_autoincrement": True}
+    ):
+        pass
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table(
+        "domain_changes", recreate="always", table_kwargs={"sqlite_autoincrement": False}
+    ):
+        pass
@@ -0,0 +1,17 @@
+"""Index on domains.updated_at for incremental DNS zone publishing"""
+
+from alembic import op
+
+
+revision = "0008_domains_updated_at_index"
+down_revision = "0007_domain_changes_autoincrement"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_domains_updated_at", "domains", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_domains_updated_at", table_name="domains")
@@ -0,0 +1,280 @@
+"""
+analytics.py — /verify traffic counters, aggregated in memory and flushed in batches.
+
+Design decisions:
+- The hot path only touches a dict: record() bumps a counter and adds the
+  referring origin to a HyperLogLog sketch for (domain, time bucket).
+  No database write happens per request.
+- Each worker flushes its pending aggregates every analytics_flush_interval
+  seconds (or early, once analytics_max_keys pairs are pending) into the
+  verify_rollups table: missing rows are inserted, then every row is
+  locked, merged and written back. Counts are added; sketches are merged.
+- Unknown domains are not recorded, so scanners probing random names
+  cannot grow the pending set.
+- Sketches start sparse (exact set of hashes) and switch to 2^10 dense
+  registers (~3% standard error) once they hold more than SPARSE_LIMIT
+  values, so the long tail of rarely verified domains stays small.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from sqlalchemy import and_, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import VerifyRollup
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Rows per upsert statement, well below the bind-parameter limits of both backends
+_FLUSH_CHUNK = 200
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Cardinality sketch with a sparse (exact) mode for small sets."""
+
+    P = 10
+    M = 1 << P
+    SPARSE_LIMIT = 64
+    _ALPHA = 0.7213 / (1 + 1.079 / M)
+
+    def __init__(self) -> None:
+        self._sparse: set[int] | None = set()
+        self._registers: bytearray | None = None
+
+    def add(self, value: str) -> None:
+        self._add_hash(_hash64(value))
+
+    def _add_hash(self, h: int) -> None:
+        if self._sparse is not None:
+            self._sparse.add(h)
+            if len(self._sparse) > self.SPARSE_LIMIT:
+                self._densify()
+            return
+        index = h >> (64 - self.P)
+        rest = h & ((1 << (64 - self.P)) - 1)
+        rank = (64 - self.P) - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def _densify(self) -> None:
+        hashes, self._sparse = self._sparse, None
+        self._registers = bytearray(self.M)
+        for h in hashes:
+            self._add_hash(h)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other._sparse is not None:
+            for h in other._sparse:
+                self._add_hash(h)
+            return
+        if self._sparse is not None:
+            self._densify()
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def count(self) -> int:
+        if self._sparse is not None:
+            return len(self._sparse)
+        estimate = self._ALPHA * self.M * self.M / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * self.M and zeros:
+            estimate = self.M * math.log(self.M / zeros)  # linear counting for small ranges
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        if self._sparse is not None:
+            return b"S" + b"".join(h.to_bytes(8, "big") for h in sorted(self._sparse))
+        return b"D" + bytes(self._registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | None) -> "HyperLogLog":
+        sketch = cls()
+        if not data:
+            return sketch
+        if data[:1] == b"D":
+            sketch._sparse = None
+            sketch._registers = bytearray(data[1:])
+        else:
+            sketch._sparse = {int.from_bytes(data[i:i + 8], "big") for i in range(1, len(data), 8)}
+        return sketch
+
+
+def referrer_origin(origin: str | None, referer: str | None) -> str | None:
+    """Reduce Origin / Referer headers to a scheme://host key."""
+    for value in (origin, referer):
+        if value and value != "null":
+            parts = urlsplit(value)
+            if parts.netloc:
+                return f"{parts.scheme}://{parts.netloc}".lower()
+    return None
+
+
+def bucket_start(moment: datetime) -> datetime:
+    size = settings.analytics_bucket_seconds
+    return datetime.fromtimestamp(int(moment.timestamp()) // size * size, tz=timezone.utc)
+
+
+class VerifyAnalytics:
+    """Per-worker aggregation of /verify traffic with periodic flushes."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._pending: dict[tuple[str, datetime], list] = {}
+        self._flush_soon = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def record(self, domain_name: str, referrer: str | None) -> None:
+        """Count one verification. O(1), no I/O."""
+        key = (domain_name, bucket_start(datetime.now(timezone.utc)))
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = [0, HyperLogLog()]
+            if len(self._pending) >= settings.analytics_max_keys:
+                self._flush_soon.set()
+        entry[0] += 1
+        if referrer:
+            entry[1].add(referrer)
+
+    async def flush(self) -> int:
+        """Upsert pending aggregates into verify_rollups. Returns the number of rows written."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            items = list(pending.items())
+            async with self._session_factory() as session:
+                for i in range(0, len(items), _FLUSH_CHUNK):
+                    await self._upsert(session, dict(items[i:i + _FLUSH_CHUNK]))
+                await session.commit()
+        except Exception:
+            # Put the counts back so they are retried with the next flush
+            for key, (count, sketch) in pending.items():
+                entry = self._pending.setdefault(key, [0, HyperLogLog()])
+                entry[0] += count
+                entry[1].merge(sketch)
+            raise
+        return len(pending)
+
+    async def _upsert(self, session: AsyncSession, pending: dict[tuple[str, datetime], list]) -> None:
+        keys = sorted(pending)
+        # Make sure every row exists, so that all of them can be locked below.
+        # A row another worker is inserting concurrently makes us wait for its commit.
+        insert = pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+        await session.execute(
+            insert(VerifyRollup)
+            .values([{"domain_name": name, "bucket_start": start, "verify_count": 0} for name, start in keys])
+            .on_conflict_do_nothing(index_elements=[VerifyRollup.domain_name, VerifyRollup.bucket_start])
+        )
+
+        # Read, merge and write back under the row locks, so no flush loses another's sketch
+        result = await session.execute(
+            select(VerifyRollup.domain_name, VerifyRollup.bucket_start,
+                   VerifyRollup.verify_count, VerifyRollup.referrer_sketch)
+            .where(tuple_(VerifyRollup.domain_name, VerifyRollup.bucket_start).in_(keys))
+            .order_by(VerifyRollup.domain_name, VerifyRollup.bucket_start)
+            .with_for_update()
+        )
+        rows = []
+        for name, start, stored_count, stored_sketch in result.all():
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=timezone.utc)
+            count, sketch = pending[(name, start)]
+            merged = HyperLogLog.from_bytes(stored_sketch)
+            merged.merge(sketch)
+            rows.append({
+                "domain_name": name,
+                "bucket_start": start,
+                "verify_count": stored_count + count,
+                "referrer_sketch": merged.to_bytes(),
+            })
+        await session.execute(update(VerifyRollup), rows)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="analytics-flusher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final analytics flush failed")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_soon.wait(), timeout=settings.analytics_flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_soon.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Analytics flush failed")
+
+
+async def top_domains(session: AsyncSession, since: datetime, limit: int) -> list[tuple[str, int, int]]:
+    """Most verified domains since `since`: [(domain, verify_count, unique_referrers)]."""
+    total = func.sum(VerifyRollup.verify_count).label("total")
+    result = await session.execute(
+        select(VerifyRollup.domain_name, total)
+        .where(VerifyRollup.bucket_start >= since)
+        .group_by(VerifyRollup.domain_name)
+        .order_by(total.desc())
+        .limit(limit)
+    )
+    ranked = result.all()
+    if not ranked:
+        return []
+
+    sketches: dict[str, HyperLogLog] = {name: HyperLogLog() for name, _ in ranked}
+    result = await session.execute(
+        select(VerifyRollup.domain_name, VerifyRollup.referrer_sketch)
+        .where(VerifyRollup.domain_name.in_(sketches), VerifyRollup.bucket_start >= since)
+    )
+    for name, data in result.all():
+        sketches[name].merge(HyperLogLog.from_bytes(data))
+    return [(name, int(count), sketches[name].count()) for name, count in ranked]
+
+
+async def domain_timeseries(
+    session: AsyncSession, domain_name: str, since: datetime, until: datetime
+) -> list[tuple[datetime, int, int]]:
+    """Per-bucket traffic for one domain: [(bucket_start, verify_count, unique_referrers)]."""
+    result = await session.execute(
+        select(VerifyRollup.bucket_start, VerifyRollup.verify_count, VerifyRollup.referrer_sketch)
+        .where(
+            and_(
+                VerifyRollup.domain_name == domain_name,
+                VerifyRollup.bucket_start >= since,
+                VerifyRollup.bucket_start < until,
+            )
+        )
+        .order_by(VerifyRollup.bucket_start)
+    )
+    return [(start, count, HyperLogLog.from_bytes(data).count()) for start, count, data in result.all()]
+
+
+def window_start(hours: int) -> datetime:
+    return bucket_start(datetime.now(timezone.utc) - timedelta(hours=hours))
+
+
+verify_analytics = VerifyAnalytics()
@@ -0,0 +1,143 @@
+"""
+archival.py — Moves cold records out of the hot `domains` table.
+
+The `domains` table (and the domain_name index /verify probes) should only
+hold records that are actually looked up. A background job moves revoked
+records older than archive_after_days into `domains_archive`, in batches
+of archive_batch_size, each batch in its own transaction:
+INSERT ... SELECT into the archive, then DELETE from the hot table.
+Batches are selected with SKIP LOCKED so every worker can run the job.
+
+/verify falls back to the archive on a hot-table miss, so archived revoked
+records keep reporting 'revoked'.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import ArchivedDomain, Domain
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Columns copied verbatim from domains to domains_archive
+_COPIED = (
+    "id", "domain_name", "status", "compliance_level", "issued_at", "revoked_at",
+    "expires_at", "signature", "public_key", "created_at", "updated_at",
+)
+
+
+def archive_domain(db: AsyncSession, domain: Domain, reason: str) -> None:
+    """Copy a single record into the archive within the caller's transaction."""
+    db.add(ArchivedDomain(
+        **{name: getattr(domain, name) for name in _COPIED},
+        archive_reason=reason,
+    ))
+
+
+async def lookup_records(db: AsyncSession, domain_names: list[str]) -> dict[str, Domain | ArchivedDomain]:
+    """
+    Load the records for `domain_names` with one query against the hot table,
+    plus one against the archive for the misses. Only records archived by the
+    revocation job are served; deleted records are kept for audit only, even
+    if they had been revoked before deletion.
+    """
+    result = await db.execute(select(Domain).where(Domain.domain_name.in_(domain_names)))
+    records: dict[str, Domain | ArchivedDomain] = {r.domain_name: r for r in result.scalars()}
+
+    archived = [name for name in domain_names if name not in records]
+    if archived:
+        result = await db.execute(
+            select(ArchivedDomain)
+            .where(ArchivedDomain.domain_name.in_(archived), ArchivedDomain.archive_reason == "revoked")
+            .order_by(ArchivedDomain.archived_at)
+        )
+        # Ordered oldest first, so the most recently archived record wins
+        records.update((r.domain_name, r) for r in result.scalars())
+    return records
+
+
+async def archive_revoked_batch(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+    """Move one batch of records revoked before `cutoff`. Returns the number moved."""
+    result = await db.execute(
+        select(Domain.id)
+        .where(Domain.status == "revoked", Domain.revoked_at < cutoff)
+        .order_by(Domain.revoked_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    ids = result.scalars().all()
+    if not ids:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    source = select(
+        *(getattr(Domain, name) for name in _COPIED),
+        literal(now, ArchivedDomain.archived_at.type),
+        literal("revoked"),
+    ).where(Domain.id.in_(ids))
+    await db.execute(
+        insert(ArchivedDomain).from_select([*_COPIED, "archived_at", "archive_reason"], source)
+    )
+    await db.execute(delete(Domain).where(Domain.id.in_(ids)))
+    return len(ids)
+
+
+async def archive_revoked(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    older_than: timedelta | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """Archive every revoked record older than `older_than`, batch by batch. Returns the total moved."""
+    older_than = older_than if older_than is not None else timedelta(days=settings.archive_after_days)
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = datetime.now(timezone.utc) - older_than
+
+    total = 0
+    while True:
+        async with session_factory() as session:
+            moved = await archive_revoked_batch(session, cutoff, batch_size)
+            await session.commit()
+        total += moved
+        if moved < batch_size:
+            break
+    if total:
+        logger.info("Archived %d revoked domain record(s).", total)
+    return total
+
+
+class Archiver:
+    """Runs archive_revoked() every archive_interval seconds."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="archiver")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await archive_revoked(self._session_factory)
+            except Exception:
+                logger.exception("Archival run failed")
+            await asyncio.sleep(settings.archive_interval)
+
+
+archiver = Archiver()
@@ -0,0 +1,85 @@
+"""
+cache.py — In-process caches of /verify responses and stapled tokens.
+
+Entries expire after verify_cache_ttl seconds and are evicted explicitly
+when a domain changes (see app.events). A generation counter guards
+against a race where a request reads a record from the DB, the record is
+revoked and invalidated, and the request then caches the stale value:
+set() is ignored if any invalidation happened since the read started.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class TTLCache:
+    """Bounded LRU mapping with per-entry expiry."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, generation: int | None = None, ttl: float | None = None) -> None:
+        """
+        Store `value`, unless an invalidation happened after `generation` was read.
+        `ttl` can only shorten the cache-wide lifetime.
+        """
+        if generation is not None and generation != self._generation:
+            return
+        ttl = self._ttl if ttl is None else min(ttl, self._ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self._generation += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+verify_cache = TTLCache(settings.verify_cache_ttl, settings.verify_cache_max_entries)
+# Entry lifetimes are set per token (see app.staple); the cache-wide TTL is only an upper bound
+staple_cache = TTLCache(settings.staple_ttl, settings.verify_cache_max_entries)
+
+
+def invalidate_domain(domain_name: str) -> None:
+    """Evict every per-process cached value derived from `domain_name`."""
+    verify_cache.invalidate(domain_name)
+    staple_cache.invalidate(domain_name)
+
+
+def invalidate_all() -> None:
+    """Drop every per-process cache (e.g. after missing change notifications)."""
+    verify_cache.clear()
+    staple_cache.clear()
@@ -7,11 +7,14 @@ Design decisions:
 - On first run, a keypair is generated automatically.
 - The public key is stored in hex inside the database alongside each domain record.
 - The canonical payload for signing is a deterministic JSON string (sorted keys).
+- expires_at is only part of the payload when set, so records issued
+  without an expiry keep their original signatures.
 """
 
 import json
 import os
 import logging
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -25,6 +28,7 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 _signing_key: nacl.signing.SigningKey | None = None
+_public_key_hex: str | None = None
 
 
 def _get_key_path() -> Path:
@@ -46,44 +50,83 @@ def load_or_create_keypair() -> nacl.signing.SigningKey:
         _signing_key = nacl.signing.SigningKey(raw)
         logger.info("Ed25519 signing key loaded from %s", key_path)
     else:
-        _signing_key = nacl.signing.SigningKey.generate()
+        candidate = nacl.signing.SigningKey.generate()
         key_path.parent.mkdir(parents=True, exist_ok=True)
-        key_path.write_bytes(bytes(_signing_key))
-        # Restrict permissions on Unix-like systems
+        # Write the full seed to a private temp file first, then hard-link it into
+        # place: the link is atomic and fails if another worker got there first,
+        # so no process can ever read a partially written key.
+        tmp_path = key_path.with_name(f".{key_path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
         try:
-            os.chmod(key_path, 0o600)
-        except OSError:
-            pass
+            with os.fdopen(fd, "wb") as f:
+                f.write(bytes(candidate))
+                f.flush()
+                os.fsync(f.fileno())
+            os.link(tmp_path, key_path)
+        except FileExistsError:
+            _signing_key = nacl.signing.SigningKey(key_path.read_bytes())
+            logger.info("Ed25519 signing key loaded from %s", key_path)
+            return _signing_key
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        _signing_key = candidate
         logger.warning("New Ed25519 keypair generated and saved to %s", key_path)
 
     return _signing_key
 
 
+def get_public_key_hex() -> str:
+    """Hex-encoded public half of the signing key (computed once)."""
+    global _public_key_hex
+    if _public_key_hex is None:
+        key = load_or_create_keypair()
+        _public_key_hex = key.verify_key.encode(encoder=nacl.encoding.HexEncoder).decode()
+    return _public_key_hex
+
+
+@lru_cache(maxsize=64)
+def get_verify_key(public_key_hex: str) -> nacl.signing.VerifyKey:
+    """
+    Parse a hex public key once. Records share a handful of keys,
+    so re-parsing on every verification is wasted work.
+    """
+    return nacl.signing.VerifyKey(bytes.fromhex(public_key_hex))
+
+
+def format_utc(value: datetime) -> str:
+    """
+    Serialise a datetime as ISO 8601 UTC with Z suffix, second precision.
+    Naive values (SQLite) are assumed to be UTC already.
+    """
+    # Normalise: if naive, assume UTC; then strip offset for consistent Z suffix
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S") + "Z"
+
+
 def build_canonical_payload(
     domain_name: str,
     status: str,
     compliance_level: str,
     issued_at: datetime,
+    expires_at: datetime | None = None,
 ) -> bytes:
     """
     Build a deterministic, canonical JSON bytes object to sign.
-    Keys are sorted; datetime is serialised as ISO 8601 UTC with Z suffix.
+    Keys are sorted; datetimes are serialised as ISO 8601 UTC with Z suffix.
+    The expires_at key is omitted entirely for records without an expiry.
 
     Handles both tz-aware datetimes (from PostgreSQL) and naive datetimes
     (from SQLite used in tests) by assuming UTC for naive values.
     """
-    # Normalise: if naive, assume UTC; then strip offset for consistent Z suffix
-    if issued_at.tzinfo is None:
-        iso = issued_at.strftime("%Y-%m-%dT%H:%M:%S") + "Z"
-    else:
-        iso = issued_at.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S") + "Z"
-
     payload = {
         "domain_name": domain_name,
         "status": status,
         "compliance_level": compliance_level,
-        "issued_at": iso,
+        "issued_at": format_utc(issued_at),
     }
+    if expires_at is not None:
+        payload["expires_at"] = format_utc(expires_at)
     return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
 
 
@@ -92,6 +135,7 @@ def sign_domain(
     status: str,
     compliance_level: str,
     issued_at: datetime,
+    expires_at: datetime | None = None,
 ) -> tuple[str, str]:
     """
     Sign the canonical domain payload.
@@ -100,12 +144,11 @@ def sign_domain(
         (signature_hex, public_key_hex)
     """
     key = load_or_create_keypair()
-    payload = build_canonical_payload(domain_name, status, compliance_level, issued_at)
+    payload = build_canonical_payload(domain_name, status, compliance_level, issued_at, expires_at)
     signed = key.sign(payload)
     # Extract raw 64-byte signature (first 64 bytes of signed.signature)
     signature_hex = signed.signature.hex()
-    public_key_hex = key.verify_key.encode(encoder=nacl.encoding.HexEncoder).decode()
-    return signature_hex, public_key_hex
+    return signature_hex, get_public_key_hex()
 
 
 def verify_signature(
@@ -115,6 +158,7 @@ def verify_signature(
     issued_at: datetime,
     signature_hex: str,
     public_key_hex: str,
+    expires_at: datetime | None = None,
 ) -> bool:
     """
     Verify the Ed25519 signature of a domain record.
@@ -123,9 +167,8 @@ def verify_signature(
     The public key is read from the DB record — the private key is never used here.
     """
     try:
-        public_key_bytes = bytes.fromhex(public_key_hex)
-        verify_key = nacl.signing.VerifyKey(public_key_bytes)
-        payload = build_canonical_payload(domain_name, status, compliance_level, issued_at)
+        verify_key = get_verify_key(public_key_hex)
+        payload = build_canonical_payload(domain_name, status, compliance_level, issued_at, expires_at)
         signature_bytes = bytes.fromhex(signature_hex)
         verify_key.verify(payload, signature_bytes)
         return True
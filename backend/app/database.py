@@ -4,10 +4,18 @@ from app.config import get_settings
 
 settings = get_settings()
 
+# SQLite (tests, local dev) uses a pool class that does not take sizing arguments
+_pool_kwargs = (
+    {}
+    if settings.db_url_async.startswith("sqlite")
+    else {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow}
+)
+
 engine = create_async_engine(
     settings.db_url_async,
     echo=False,
     pool_pre_ping=True,
+    **_pool_kwargs,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -32,3 +40,11 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    FastAPI dependency for handlers that manage sessions themselves,
+    e.g. streaming responses whose body outlives get_db.
+    """
+    return AsyncSessionLocal
@@ -0,0 +1,341 @@
+"""
+dns_publisher.py — Publishes signed domain statuses as DNS TXT records.
+
+Run periodically (cron, scheduler): `python -m app.dns_publisher`.
+
+Each record in `domains` becomes a TXT record at <domain_name>.<DNS_ZONE>:
+
+    "v=cs1; d=example.com; s=active; l=basic; i=2026-02-24T12:00:00Z; sig=<hex>; k=<hex>"
+
+d, l, i and e (expires_at, when set) are the fields of the canonical
+payload from crypto.build_canonical_payload, so a resolver-side verifier
+can rebuild it (status 'active') and check sig against k. s is the current
+status and r the revocation time, exactly as /verify reports them. Text
+longer than 255 bytes is split into several character-strings.
+
+Design decisions:
+- Streaming: names are read through a server-side cursor ordered by
+  domain_name and merged with the previous zone file, which is written in
+  the same order. Memory use does not depend on the number of records.
+- Incremental: only rows updated since the last run's updated_at
+  watermark (minus dns_watermark_overlap, for transactions that committed
+  late), plus lapsed rows the expiry sweeper has not reached yet, are
+  streamed in full, in name order, and re-rendered. Every other name comes
+  from a names-only stream and its line is copied from the previous zone. Names that disappeared from
+  `domains` (deleted, archived) are dropped. The first run, or a run
+  whose previous zone cannot be reused, renders every row.
+- Every run writes a complete zone file with a new SOA serial. With
+  --updates it also writes an nsupdate (RFC 2136) script containing only
+  the changes, in batches of dns_update_batch_size records per `send`.
+- Archived records are not published; verifiers treat a missing TXT
+  record as "no compliance record".
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, TextIO
+from urllib.parse import quote, unquote
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.crypto import format_utc
+from app.database import AsyncSessionLocal, engine
+from app.expiry import effective_status
+from app.models import Domain
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RECORD_VERSION = "cs1"
+
+# Rows fetched from the cursor per round trip
+YIELD_PER = 1000
+
+# SOA refresh / retry / expire; the negative-caching TTL is dns_ttl
+_SOA_TIMERS = (3600, 600, 1209600)
+
+_PUBLISHED_COLUMNS = (
+    Domain.domain_name,
+    Domain.status,
+    Domain.compliance_level,
+    Domain.issued_at,
+    Domain.revoked_at,
+    Domain.expires_at,
+    Domain.signature,
+    Domain.public_key,
+    Domain.updated_at,
+)
+
+_LABEL = re.compile(r"^(?!-)[A-Za-z0-9_-]{1,63}(?<!-)$")
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def is_publishable(domain_name: str) -> bool:
+    """True if `domain_name` can be used as a relative owner name in the zone."""
+    if len(domain_name) + 1 + len(settings.dns_zone) > 254:
+        return False
+    return all(_LABEL.match(label) for label in domain_name.split("."))
+
+
+def render_txt(row, now: datetime | None = None) -> str:
+    """TXT rdata (quoted character-strings) for one domain row."""
+    fields = [
+        ("v", RECORD_VERSION),
+        ("d", row.domain_name),
+        ("s", effective_status(row, now)),
+        ("l", quote(row.compliance_level, safe="")),
+        ("i", format_utc(row.issued_at)),
+    ]
+    if row.expires_at is not None:
+        fields.append(("e", format_utc(row.expires_at)))
+    if row.revoked_at is not None:
+        fields.append(("r", format_utc(row.revoked_at)))
+    fields += [("sig", row.signature), ("k", row.public_key)]
+
+    text = "; ".join(f"{key}={value}" for key, value in fields)
+    return " ".join(f'"{text[i:i + 255]}"' for i in range(0, len(text), 255))
+
+
+def parse_txt(text: str) -> dict[str, str]:
+    """Inverse of render_txt() for the concatenated TXT strings."""
+    fields = dict(part.split("=", 1) for part in text.split("; "))
+    fields["l"] = unquote(fields["l"])
+    return fields
+
+
+def next_serial(previous: int, now: datetime) -> int:
+    """SOA serial: Unix time, but always greater than the previous serial."""
+    return max(previous + 1, int(now.timestamp()))
+
+
+def _zone_header(serial: int) -> str:
+    refresh, retry, expire = _SOA_TIMERS
+    return (
+        f"$ORIGIN {settings.dns_zone}\n"
+        f"$TTL {settings.dns_ttl}\n"
+        f"@ IN SOA {settings.dns_primary_ns} {settings.dns_hostmaster} "
+        f"{serial} {refresh} {retry} {expire} {settings.dns_ttl}\n"
+        f"@ IN NS {settings.dns_primary_ns}\n"
+        f"; records\n"
+    )
+
+
+def _zone_records(stream: TextIO) -> Iterator[tuple[str, str]]:
+    """Yield (owner name, line) for the TXT records of a zone written by publish()."""
+    for line in stream:
+        line = line.rstrip("\n")
+        if line and line[0] not in "$@; ":
+            yield line.split(" ", 1)[0], line
+
+
+class UpdateScript:
+    """Writes RFC 2136 changes as an nsupdate script, one `send` per batch."""
+
+    def __init__(self, stream: TextIO | None, serial: int) -> None:
+        self._stream = stream
+        self._pending = 0
+        if stream is not None:
+            stream.write(f"; changes for serial {serial}\n")
+            self._begin()
+
+    def _begin(self) -> None:
+        if settings.dns_update_server:
+            self._stream.write(f"server {settings.dns_update_server}\n")
+        self._stream.write(f"zone {settings.dns_zone}\n")
+
+    def _fqdn(self, name: str) -> str:
+        return f"{name}.{settings.dns_zone}"
+
+    def delete(self, name: str) -> None:
+        if self._stream is None:
+            return
+        self._stream.write(f"update delete {self._fqdn(name)} TXT\n")
+        self._count()
+
+    def replace(self, name: str, rdata: str) -> None:
+        if self._stream is None:
+            return
+        self._stream.write(f"update delete {self._fqdn(name)} TXT\n")
+        self._stream.write(f"update add {self._fqdn(name)} {settings.dns_ttl} TXT {rdata}\n")
+        self._count()
+
+    def _count(self) -> None:
+        self._pending += 1
+        if self._pending >= settings.dns_update_batch_size:
+            self._stream.write("send\n")
+            self._pending = 0
+            self._begin()
+
+    def close(self) -> None:
+        if self._stream is not None and self._pending:
+            self._stream.write("send\n")
+
+
+def _load_state(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+async def publish(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    zone_path: str | Path | None = None,
+    state_path: str | Path | None = None,
+    update_path: str | Path | None = None,
+    now: datetime | None = None,
+) -> dict:
+    """
+    Write the zone file (and optionally an nsupdate script of the changes).
+    Returns counts: records, added, changed, removed, skipped, and the serial.
+    """
+    zone_path = Path(zone_path or settings.dns_zone_file)
+    state_path = Path(state_path or settings.dns_state_file)
+    now = now or datetime.now(timezone.utc)
+
+    state = _load_state(state_path)
+    # A zone rendered with another origin or TTL cannot be reused line by line
+    reusable = (
+        zone_path.exists()
+        and state.get("zone") == settings.dns_zone
+        and state.get("ttl") == settings.dns_ttl
+        and state.get("watermark") is not None
+    )
+    since = (
+        datetime.fromisoformat(state["watermark"]) - timedelta(seconds=settings.dns_watermark_overlap)
+        if reusable else None
+    )
+    serial = next_serial(state.get("serial", 0), now)
+    watermark = datetime.fromisoformat(state["watermark"]) if reusable else None
+    counts = {"serial": serial, "records": 0, "added": 0, "changed": 0, "removed": 0, "skipped": 0}
+
+    tmp_path = zone_path.with_name(zone_path.name + ".tmp")
+    with (
+        open(tmp_path, "w", encoding="ascii") as out,
+        open(zone_path, encoding="ascii") if reusable else nullcontext([]) as previous,
+        open(update_path, "w", encoding="ascii") if update_path else nullcontext() as update_stream,
+    ):
+        updates = UpdateScript(update_stream, serial)
+        out.write(_zone_header(serial))
+        old = _zone_records(previous)
+        old_entry = next(old, None)
+
+        async with session_factory() as session:
+            name_order = Domain.domain_name
+            if session.bind.dialect.name == "postgresql":
+                # Byte order, to match the order of names in the zone file
+                name_order = Domain.domain_name.collate("C")
+            changed = None
+            if since is None:
+                result = await session.stream(
+                    select(*_PUBLISHED_COLUMNS).order_by(name_order).execution_options(yield_per=YIELD_PER)
+                )
+            else:
+                # Changed rows, streamed in the same order as the names they are merged with.
+                # Lapsed but not yet swept records change status without touching updated_at.
+                changed = aiter(await session.stream(
+                    select(*_PUBLISHED_COLUMNS)
+                    .where(or_(
+                        Domain.updated_at > since,
+                        and_(Domain.status == "active", Domain.expires_at <= now),
+                    ))
+                    .order_by(name_order)
+                    .execution_options(yield_per=YIELD_PER)
+                ))
+                changed_row = await anext(changed, None)
+                result = await session.stream(
+                    select(Domain.domain_name).order_by(name_order).execution_options(yield_per=YIELD_PER)
+                )
+            async for row in result:
+                name = row.domain_name
+                if not is_publishable(name):
+                    logger.warning("Skipping %r: not usable as a DNS name", name)
+                    counts["skipped"] += 1
+                    continue
+
+                # Names in the previous zone that sort before this row are gone
+                while old_entry is not None and old_entry[0] < name:
+                    updates.delete(old_entry[0])
+                    counts["removed"] += 1
+                    old_entry = next(old, None)
+                old_line = None
+                if old_entry is not None and old_entry[0] == name:
+                    old_line = old_entry[1]
+                    old_entry = next(old, None)
+
+                if changed is not None:
+                    while changed_row is not None and changed_row.domain_name < name:
+                        changed_row = await anext(changed, None)
+                    if changed_row is not None and changed_row.domain_name == name:
+                        row = changed_row
+                    elif old_line is not None:
+                        out.write(old_line + "\n")
+                        counts["records"] += 1
+                        continue
+                    else:
+                        # Unchanged, but missing from the previous zone
+                        row = (await session.execute(
+                            select(*_PUBLISHED_COLUMNS).where(Domain.domain_name == name)
+                        )).one()
+
+                updated_at = _as_utc(row.updated_at)
+                watermark = updated_at if watermark is None else max(watermark, updated_at)
+                rdata = render_txt(row, now)
+                line = f"{name} {settings.dns_ttl} IN TXT {rdata}"
+                if line != old_line:
+                    updates.replace(name, rdata)
+                    counts["added" if old_line is None else "changed"] += 1
+                out.write(line + "\n")
+                counts["records"] += 1
+
+        while old_entry is not None:
+            updates.delete(old_entry[0])
+            counts["removed"] += 1
+            old_entry = next(old, None)
+        updates.close()
+
+    os.replace(tmp_path, zone_path)
+    state_path.write_text(json.dumps({
+        "zone": settings.dns_zone,
+        "ttl": settings.dns_ttl,
+        "serial": serial,
+        "watermark": watermark.isoformat() if watermark else None,
+    }))
+    logger.info(
+        "Zone %s serial %d: %d records (%d added, %d changed, %d removed, %d skipped)",
+        settings.dns_zone, serial, counts["records"], counts["added"], counts["changed"],
+        counts["removed"], counts["skipped"],
+    )
+    return counts
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        await publish(zone_path=args.zone_file, state_path=args.state_file, update_path=args.updates)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.dns_publisher", description="Publish the TXT zone.")
+    parser.add_argument("--zone-file", default=settings.dns_zone_file)
+    parser.add_argument("--state-file", default=settings.dns_state_file)
+    parser.add_argument("--updates", help="also write the changes as an nsupdate (RFC 2136) script")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
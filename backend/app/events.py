@@ -0,0 +1,97 @@
+"""
+events.py — Domain change events.
+
+Every mutation of a Domain record — admin requests and the expiry sweeper
+alike — goes through publish_domain_event() / publish_domain_events().
+The event is written to the webhook outbox inside the caller's transaction,
+so it is delivered if and only if the change itself commits. The dispatcher
+is only woken after the commit; the request never waits on delivery.
+Cached /verify responses for the domain are evicted after the commit too,
+in this process directly and in every other worker through app.notify.
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import invalidate_domain
+from app.crypto import format_utc
+from app.models import Domain, WebhookEndpoint, WebhookOutbox
+from app.notify import publish_changes
+from app.webhooks import dispatcher
+
+DOMAIN_CREATED = "domain.created"
+DOMAIN_REVOKED = "domain.revoked"
+DOMAIN_EXPIRED = "domain.expired"
+DOMAIN_DELETED = "domain.deleted"
+
+EVENT_TYPES = (DOMAIN_CREATED, DOMAIN_REVOKED, DOMAIN_EXPIRED, DOMAIN_DELETED)
+
+
+def _iso(value: datetime | None) -> str | None:
+    return format_utc(value) if value is not None else None
+
+
+def build_event(event_type: str, domain: Domain) -> dict:
+    """Build the JSON-serialisable event body for a domain change."""
+    return {
+        "id": str(uuid.uuid4()),
+        "type": event_type,
+        "created_at": _iso(datetime.now(timezone.utc)),
+        "data": {
+            "id": domain.id,
+            "domain": domain.domain_name,
+            "status": domain.status,
+            "compliance_level": domain.compliance_level,
+            "issued_at": _iso(domain.issued_at),
+            "revoked_at": _iso(domain.revoked_at),
+            "expires_at": _iso(domain.expires_at),
+            "signature": domain.signature,
+            "public_key": domain.public_key,
+        },
+    }
+
+
+def after_commit(db: AsyncSession, callback) -> None:
+    """Run `callback()` once the session's current transaction commits."""
+    event.listen(db.sync_session, "after_commit", lambda _session: callback(), once=True)
+
+
+async def publish_domain_event(db: AsyncSession, event_type: str, domain: Domain) -> None:
+    """
+    Record a domain change event in the caller's transaction.
+
+    One outbox row is queued per subscribed webhook endpoint; the webhook
+    dispatcher is notified after commit and delivers in the background.
+    """
+    await publish_domain_events(db, event_type, [domain])
+
+
+async def publish_domain_events(db: AsyncSession, event_type: str, domains: list[Domain]) -> None:
+    """Batch form of publish_domain_event(): one endpoint lookup and one change broadcast."""
+    if not domains:
+        return
+    domain_names = [domain.domain_name for domain in domains]
+    await publish_changes(db, domain_names)
+
+    def invalidate() -> None:
+        for name in domain_names:
+            invalidate_domain(name)
+
+    after_commit(db, invalidate)
+
+    result = await db.execute(select(WebhookEndpoint))
+    endpoints = [ep for ep in result.scalars().all() if event_type in ep.event_types]
+    if not endpoints:
+        return
+
+    for domain in domains:
+        payload = json.dumps(build_event(event_type, domain), separators=(",", ":"))
+        db.add_all(
+            WebhookOutbox(endpoint_id=ep.id, event_type=event_type, payload=payload)
+            for ep in endpoints
+        )
+    after_commit(db, dispatcher.notify)
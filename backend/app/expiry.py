@@ -0,0 +1,117 @@
+"""
+expiry.py — Scheduled transition of lapsed records from 'active' to 'expired'.
+
+The sweeper runs in-process every expiry_sweep_interval seconds. Each batch
+is one transaction: the next expiry_batch_size due rows are selected through
+the partial index on expires_at (SKIP LOCKED, so every worker can sweep),
+moved to 'expired' with a single UPDATE, and announced through
+publish_domain_events() — the same cache invalidation, change broadcast and
+webhook events as a manual revoke.
+
+/verify already reports 'expired' as soon as expires_at passes; the sweeper
+makes the stored status, admin listings and partners catch up.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.events import DOMAIN_EXPIRED, publish_domain_events
+from app.models import Domain
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def is_expired(expires_at: datetime | None, now: datetime | None = None) -> bool:
+    """True once `expires_at` has passed (naive values are UTC)."""
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= (now or datetime.now(timezone.utc))
+
+
+def effective_status(record, now: datetime | None = None) -> str:
+    """A lapsed record is reported as expired even before the sweeper updates it."""
+    if record.status == "active" and is_expired(record.expires_at, now):
+        return "expired"
+    return record.status
+
+
+async def expire_batch(db: AsyncSession, now: datetime, batch_size: int) -> int:
+    """Expire one batch of due records. Returns the number transitioned."""
+    result = await db.execute(
+        select(Domain)
+        .where(Domain.status == "active", Domain.expires_at <= now)
+        .order_by(Domain.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    domains = list(result.scalars().all())
+    if not domains:
+        return 0
+
+    await db.execute(
+        update(Domain)
+        .where(Domain.id.in_([d.id for d in domains]))
+        .values(status="expired", updated_at=now)
+    )
+    await publish_domain_events(db, DOMAIN_EXPIRED, domains)
+    return len(domains)
+
+
+async def expire_due(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    batch_size: int | None = None,
+) -> int:
+    """Expire every record whose expires_at has passed. Returns the total transitioned."""
+    batch_size = batch_size or settings.expiry_batch_size
+    now = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        async with session_factory() as session:
+            expired = await expire_batch(session, now, batch_size)
+            await session.commit()
+        total += expired
+        if expired < batch_size:
+            break
+    if total:
+        logger.info("Expired %d domain record(s).", total)
+    return total
+
+
+class ExpirySweeper:
+    """Runs expire_due() every expiry_sweep_interval seconds."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="expiry-sweeper")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await expire_due(self._session_factory)
+            except Exception:
+                logger.exception("Expiry sweep failed")
+            await asyncio.sleep(settings.expiry_sweep_interval)
+
+
+expiry_sweeper = ExpirySweeper()
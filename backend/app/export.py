@@ -0,0 +1,103 @@
+"""
+export.py — Constant-memory streaming of domain records as NDJSON or CSV.
+
+Rows are read through a server-side cursor (AsyncSession.stream with
+yield_per) as plain column tuples — no ORM objects, no Pydantic models —
+and each partition is encoded and sent before the next one is fetched.
+Optional gzip compression is applied on the fly.
+
+The generator opens its own session: a StreamingResponse body runs after
+request-scoped dependencies such as get_db have already been closed.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.crypto import format_utc
+from app.models import Domain
+
+EXPORT_COLUMNS = (
+    Domain.id,
+    Domain.domain_name,
+    Domain.status,
+    Domain.compliance_level,
+    Domain.issued_at,
+    Domain.revoked_at,
+    Domain.expires_at,
+    Domain.signature,
+    Domain.public_key,
+    Domain.created_at,
+    Domain.updated_at,
+)
+FIELD_NAMES = [column.key for column in EXPORT_COLUMNS]
+
+# Rows fetched from the cursor (and encoded) per round trip
+YIELD_PER = 1000
+
+
+def _row_values(row) -> list:
+    return [format_utc(v) if isinstance(v, datetime) else v for v in row]
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(FIELD_NAMES, _row_values(row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def _encode_csv(rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(FIELD_NAMES)
+    writer.writerows(["" if v is None else v for v in _row_values(row)] for row in rows)
+    return buffer.getvalue()
+
+
+async def _encoded_chunks(
+    session_factory: async_sessionmaker[AsyncSession], conditions: list, fmt: str
+) -> AsyncIterator[bytes]:
+    async with session_factory() as session:
+        result = await session.stream(
+            select(*EXPORT_COLUMNS)
+            .where(*conditions)
+            .order_by(Domain.created_at, Domain.id)
+            .execution_options(yield_per=YIELD_PER)
+        )
+        header = True
+        async for partition in result.partitions():
+            if fmt == "csv":
+                yield _encode_csv(partition, header).encode("utf-8")
+                header = False
+            else:
+                yield _encode_ndjson(partition).encode("utf-8")
+        if fmt == "csv" and header:
+            yield _encode_csv([], header=True).encode("utf-8")
+
+
+async def stream_domains(
+    session_factory: async_sessionmaker[AsyncSession],
+    conditions: list,
+    fmt: str,
+    compress: bool,
+) -> AsyncIterator[bytes]:
+    """Yield the export body, gzip-compressed on the fly when `compress` is set."""
+    if not compress:
+        async for chunk in _encoded_chunks(session_factory, conditions, fmt):
+            yield chunk
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 → gzip container
+    async for chunk in _encoded_chunks(session_factory, conditions, fmt):
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -2,19 +2,27 @@
 main.py — FastAPI application entry point.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.config import get_settings
-from app.database import engine, Base
+from app.database import engine, Base, AsyncSessionLocal
 from app.crypto import load_or_create_keypair
-from app.routers import admin, public
-from app.schemas import HealthResponse
+from app.analytics import verify_analytics
+from app.archival import archiver
+from app.expiry import expiry_sweeper
+from app.notify import create_change_listener
+from app.routers import admin, analytics, public, webhooks
+from app.startup import check_schema_revision, readiness, warm_up
+from app.webhooks import dispatcher
+from app.schemas import HealthResponse, ReadinessResponse
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,18 +36,44 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent  # project root
 async def lifespan(app: FastAPI):
     """
     Application lifespan handler:
-    - Creates DB tables if they don't exist (Alembic handles migrations in prod)
+    - Development: creates DB tables if they don't exist
+    - Production: checks the database is at the Alembic head revision instead
     - Loads or generates the Ed25519 signing keypair
+    - Starts the cross-worker change listener, the webhook dispatcher, the archiver,
+      the expiry sweeper and the analytics flusher
+    - Warms pool connections and the verify cache in the background (see /ready)
     """
-    logger.info("Starting up — creating database tables if needed…")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if settings.is_production:
+        logger.info("Starting up — checking database schema revision…")
+        await check_schema_revision(engine)
+    else:
+        logger.info("Starting up — creating database tables if needed…")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
 
     logger.info("Loading Ed25519 signing keypair…")
     load_or_create_keypair()
-    logger.info("Application ready.")
+
+    change_listener = create_change_listener(engine, AsyncSessionLocal)
+    await change_listener.start()
+    if settings.webhooks_enabled:
+        await dispatcher.start()
+    if settings.archive_enabled:
+        await archiver.start()
+    if settings.expiry_enabled:
+        await expiry_sweeper.start()
+    if settings.analytics_enabled:
+        await verify_analytics.start()
+    warmup_task = asyncio.create_task(warm_up(engine, AsyncSessionLocal), name="warm-up")
+    logger.info("Application started; warming up.")
     yield
     logger.info("Shutting down.")
+    warmup_task.cancel()
+    await verify_analytics.stop()
+    await expiry_sweeper.stop()
+    await archiver.stop()
+    await dispatcher.stop()
+    await change_listener.stop()
 
 
 app = FastAPI(
@@ -63,9 +97,19 @@ app.add_middleware(
 async def health_check():
     return HealthResponse(status="ok", version="1.0.0")
 
+
+@app.get("/ready", response_model=ReadinessResponse, tags=["Health"])
+async def readiness_check():
+    """Readiness probe: 503 until startup warm-up has finished."""
+    if not readiness.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return ReadinessResponse(status="ready")
+
 # ─── Routers ──────────────────────────────────────────────────────────────────
 app.include_router(admin.router)
 app.include_router(public.router)
+app.include_router(webhooks.router)
+app.include_router(analytics.router)
 
 # ─── Serve badge.js as a static file ──────────────────────────────────────────
 badge_dir = BASE_DIR / "badge"
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, Text, DateTime
+from sqlalchemy import String, Text, DateTime, Integer, BigInteger, LargeBinary, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -14,9 +14,26 @@ class Domain(Base):
     Represents a compliance record tied to a domain name.
     Each record is signed with Ed25519 at creation time.
     Revocation updates status to 'revoked' and stamps revoked_at.
+    Records with an expires_at move to 'expired' once it has passed.
     """
 
     __tablename__ = "domains"
+    __table_args__ = (
+        # Drives the archival job: finds revoked rows by age without a table scan
+        Index(
+            "ix_domains_revoked_at",
+            "revoked_at",
+            postgresql_where=text("status = 'revoked'"),
+        ),
+        # Drives the expiry sweeper: finds due active rows without a table scan
+        Index(
+            "ix_domains_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'active'"),
+        ),
+        # Drives the DNS publisher: finds rows changed since its last run
+        Index("ix_domains_updated_at", "updated_at"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -28,6 +45,8 @@ class Domain(Base):
         DateTime(timezone=True), nullable=False, default=utcnow
     )
     revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Optional end of the certification; part of the signed payload when set
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     # Ed25519 signature of the canonical JSON payload (hex-encoded)
     signature: Mapped[str] = mapped_column(Text, nullable=False)
     # Hex-encoded Ed25519 public key used to sign this record
@@ -41,3 +60,127 @@ class Domain(Base):
 
     def __repr__(self) -> str:
         return f"<Domain id={self.id} domain={self.domain_name} status={self.status}>"
+
+
+class ArchivedDomain(Base):
+    """
+    Cold storage for Domain records moved out of the hot `domains` table:
+    revoked records past the archival age, and deleted records when
+    archive_on_delete is enabled. A domain name can appear several times
+    (it may be re-created after deletion), so it is not unique here.
+    """
+
+    __tablename__ = "domains_archive"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    domain_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    compliance_level: Mapped[str] = mapped_column(String(50), nullable=False)
+    issued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    signature: Mapped[str] = mapped_column(Text, nullable=False)
+    public_key: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utcnow
+    )
+    # 'revoked' (moved by the archival job) or 'deleted' (moved by delete_domain)
+    archive_reason: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedDomain id={self.id} domain={self.domain_name} reason={self.archive_reason}>"
+
+
+class WebhookEndpoint(Base):
+    """
+    A partner URL that receives signed event payloads.
+    `events` is a comma-separated list of subscribed event types.
+    The shared `secret` keys the HMAC-SHA256 signature on every delivery.
+    """
+
+    __tablename__ = "webhook_endpoints"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    events: Mapped[str] = mapped_column(String(255), nullable=False, default="domain.revoked")
+    secret: Mapped[str] = mapped_column(String(128), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utcnow
+    )
+
+    @property
+    def event_types(self) -> list[str]:
+        return [e for e in self.events.split(",") if e]
+
+    def __repr__(self) -> str:
+        return f"<WebhookEndpoint id={self.id} url={self.url}>"
+
+
+class WebhookOutbox(Base):
+    """
+    Transactional outbox: one row per (event, endpoint) pending delivery.
+    Rows are written in the same transaction as the change that caused them
+    and removed once delivered; rows that exhaust their retries stay behind
+    with status 'failed' for inspection.
+    """
+
+    __tablename__ = "webhook_outbox"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    endpoint_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("webhook_endpoints.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Serialised event JSON, delivered verbatim inside the batch envelope
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utcnow, index=True
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<WebhookOutbox id={self.id} type={self.event_type} status={self.status}>"
+
+
+class DomainChange(Base):
+    """
+    Change log polled by workers to evict stale cache entries when the
+    database has no LISTEN/NOTIFY (SQLite). Rows are short-lived.
+    """
+
+    __tablename__ = "domain_changes"
+    # Without AUTOINCREMENT, SQLite reuses ids once pruning empties the table,
+    # and pollers holding a higher last-seen id would miss every new change
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    domain_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=utcnow, index=True
+    )
+
+
+class VerifyRollup(Base):
+    """
+    Per-domain /verify traffic, aggregated in memory by each worker and
+    flushed periodically (see app.analytics). One row per domain per bucket.
+    `referrer_sketch` is a serialised HyperLogLog of distinct referring origins.
+    """
+
+    __tablename__ = "verify_rollups"
+
+    domain_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, index=True)
+    verify_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    referrer_sketch: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
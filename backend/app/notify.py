@@ -0,0 +1,161 @@
+"""
+notify.py — Cross-worker change notification.
+
+Each worker keeps per-process state (the verify cache) that must not
+outlive a revocation handled by another worker. Admin mutations therefore
+publish the changed domain name inside their transaction, and every worker
+runs a listener that evicts the matching entries:
+
+- PostgreSQL: `SELECT pg_notify(channel, domain)` — one statement per
+  batch of changes, delivered on commit, dropped on rollback. Each worker
+  LISTENs on a dedicated asyncpg connection (outside the SQLAlchemy pool)
+  and clears its whole cache after a reconnect, since notifications may
+  have been missed meanwhile.
+- Other databases (SQLite): a row in domain_changes, polled every
+  change_poll_interval seconds. Old rows are pruned by the pollers.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.cache import invalidate_all, invalidate_domain
+from app.config import get_settings
+from app.models import DomainChange
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def publish_changes(db: AsyncSession, domain_names: list[str]) -> None:
+    """Announce, as part of the caller's transaction, that `domain_names` changed."""
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(
+            text("SELECT pg_notify(:channel, name) FROM unnest(CAST(:names AS text[])) AS name"),
+            {"channel": settings.change_channel, "names": domain_names},
+        )
+    else:
+        db.add_all(DomainChange(domain_name=name) for name in domain_names)
+
+
+class PostgresChangeListener:
+    """LISTENs for change notifications on a dedicated asyncpg connection."""
+
+    def __init__(self, dsn: str, channel: str) -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._task: asyncio.Task | None = None
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str) -> None:
+        invalidate_domain(payload)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="change-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self._dsn)
+                await conn.add_listener(self._channel, self._on_notify)
+                # Anything published while we were not listening is lost
+                invalidate_all()
+                logger.info("Listening for domain changes on channel '%s'", self._channel)
+                delay = 1.0
+                while True:
+                    await asyncio.sleep(30)
+                    await conn.execute("SELECT 1")  # surface dead connections
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Change listener connection lost (%s); reconnecting in %.0fs", exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+
+class PollingChangeListener:
+    """Polls the domain_changes table where LISTEN/NOTIFY is unavailable."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], interval: float) -> None:
+        self._session_factory = session_factory
+        self._interval = interval
+        self._last_id: int | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="change-poller")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("Change poll failed")
+            await asyncio.sleep(self._interval)
+
+    async def poll_once(self) -> int:
+        """Evict entries for changes since the previous poll. Returns the number seen."""
+        async with self._session_factory() as session:
+            if self._last_id is None:
+                # First poll: only changes from now on matter
+                self._last_id = (await session.execute(select(func.max(DomainChange.id)))).scalar() or 0
+                return 0
+
+            latest = (await session.execute(select(func.max(DomainChange.id)))).scalar()
+            # An empty log (everything pruned) is normal; ids going backwards is not:
+            # the table was recreated or its sequence reset, so changes may have been missed
+            if latest is not None and latest < self._last_id:
+                logger.warning("Change log ids restarted; clearing caches")
+                invalidate_all()
+                self._last_id = 0
+
+            result = await session.execute(
+                select(DomainChange.id, DomainChange.domain_name)
+                .where(DomainChange.id > self._last_id)
+                .order_by(DomainChange.id)
+            )
+            changes = result.all()
+            for change_id, domain_name in changes:
+                invalidate_domain(domain_name)
+                self._last_id = change_id
+
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.change_log_retention)
+            await session.execute(delete(DomainChange).where(DomainChange.created_at < cutoff))
+            await session.commit()
+        return len(changes)
+
+
+def create_change_listener(
+    engine: AsyncEngine, session_factory: async_sessionmaker[AsyncSession]
+) -> PostgresChangeListener | PollingChangeListener:
+    """Pick the listener matching the database backend."""
+    if engine.dialect.name == "postgresql":
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresChangeListener(dsn, settings.change_channel)
+    return PollingChangeListener(session_factory, settings.change_poll_interval)
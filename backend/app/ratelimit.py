@@ -0,0 +1,216 @@
+"""
+ratelimit.py — Admission control for the public /verify endpoint.
+
+Two independent guards run before a DB session is opened:
+- A token bucket per client (API token if a known one is presented,
+  otherwise client IP). Exhausted buckets get 429 + Retry-After.
+  Batch endpoints are charged one token per distinct domain, after
+  oversized batches have been rejected with 422.
+- A global concurrency cap on in-flight verifications. Requests that
+  cannot get a slot within verify_queue_timeout get 503 + Retry-After,
+  so a flood of scanners cannot drain the SQLAlchemy pool that badge
+  traffic and the admin API share.
+
+Bucket state lives in a pluggable backend: in-process memory by default
+(limits then apply per worker) or Redis for limits shared across workers
+and replicas. The Redis backend needs the optional `redis` package.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request, status
+
+from app.config import get_settings
+from app.schemas import StapleBatchRequest, VerifyBatchRequest
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets."""
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens from the bucket for `key`.
+        Returns 0.0 if admitted, otherwise the seconds until enough tokens refill.
+        A cost above `burst` is admitted once the bucket is full and leaves it
+        in debt, so large batches are slowed down rather than refused forever.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, bounded to `max_keys` entries (least recently seen evicted)."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        needed = min(cost, burst)
+        if tokens >= needed:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (needed - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or burst
+local ts = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local needed = math.min(cost, burst)
+local wait = 0
+if tokens >= needed then
+  tokens = tokens - cost
+else
+  wait = (needed - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared by every worker, updated atomically by a Lua script."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:") -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:  # pragma: no cover — optional dependency
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+        self._prefix = prefix
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        wait = await self._script(keys=[self._prefix + key], args=[rate, burst, cost])
+        return float(wait)
+
+
+def create_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "redis":
+        return RedisRateLimitBackend(settings.rate_limit_redis_url)
+    return InMemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight work; waits at most `timeout` seconds for a free slot."""
+
+    def __init__(self, limit: int, timeout: float) -> None:
+        self._semaphore = asyncio.Semaphore(limit)
+        self._timeout = timeout
+
+    async def acquire(self) -> bool:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self._timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+rate_limit_backend = create_backend()
+verify_concurrency = ConcurrencyLimiter(settings.verify_max_concurrency, settings.verify_queue_timeout)
+
+_api_tokens = frozenset(t.strip() for t in settings.verify_api_tokens.split(",") if t.strip())
+
+
+def client_identity(request: Request) -> tuple[str, float, float]:
+    """Return (bucket key, refill rate, burst) for the caller."""
+    token = request.headers.get("X-API-Token")
+    if token and token in _api_tokens:
+        return f"token:{token}", settings.rate_limit_token_per_second, settings.rate_limit_token_burst
+
+    ip = request.client.host if request.client else "unknown"
+    if settings.rate_limit_trust_forwarded_for:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            ip = forwarded.split(",")[0].strip()
+    return f"ip:{ip}", settings.rate_limit_per_second, settings.rate_limit_burst
+
+
+@asynccontextmanager
+async def _admitted(request: Request, cost: float = 1.0):
+    """Charge `cost` tokens to the caller's bucket, then hold a verification slot."""
+    if not settings.rate_limit_enabled:
+        yield
+        return
+
+    key, rate, burst = client_identity(request)
+    wait = await rate_limit_backend.acquire(key, rate, burst, cost)
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded.",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+    if not await verify_concurrency.acquire():
+        logger.warning("Shedding /verify request: %d verifications already in flight", settings.verify_max_concurrency)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        verify_concurrency.release()
+
+
+def _check_batch_size(domains: list[str], limit: int) -> int:
+    """Reject oversized batches before any tokens are spent; returns the number of distinct domains."""
+    if len(domains) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {limit} domains per batch.",
+        )
+    return len(set(domains))
+
+
+async def limit_verify(request: Request):
+    """
+    FastAPI dependency guarding /verify.
+    Must be declared before get_db so that rejected requests never touch the pool.
+    """
+    async with _admitted(request):
+        yield
+
+
+async def limit_verify_batch(request: Request, body: VerifyBatchRequest):
+    """Like limit_verify for POST /verify/batch, charging one token per distinct domain."""
+    async with _admitted(request, cost=_check_batch_size(body.domains, settings.verify_batch_max)):
+        yield
+
+
+async def limit_staple_batch(request: Request, body: StapleBatchRequest):
+    """Like limit_verify for POST /staple/batch, charging one token per distinct domain."""
+    async with _admitted(request, cost=_check_batch_size(body.domains, settings.staple_batch_max)):
+        yield
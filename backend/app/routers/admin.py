@@ -4,36 +4,82 @@ All routes are protected by the X-Admin-Key header.
 """
 
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select, func
 
-from app.database import get_db
+from app.database import get_db, get_session_factory
+from app.export import stream_domains
 from app.models import Domain
 from app.schemas import DomainCreate, DomainResponse, DomainListResponse
 from app.auth import require_admin
 from app.crypto import sign_domain
+from app.archival import archive_domain
+from app.config import get_settings
+from app.events import publish_domain_event, DOMAIN_CREATED, DOMAIN_REVOKED, DOMAIN_DELETED
+
+settings = get_settings()
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+def domain_filters(
+    status: Optional[Literal["active", "revoked", "expired"]] = Query(None, description="Only records with this status"),
+    compliance_level: Optional[str] = Query(None, description="Only records with this compliance level"),
+) -> list:
+    """Shared filters for listing and exporting domains, as SQL conditions."""
+    conditions = []
+    if status is not None:
+        conditions.append(Domain.status == status)
+    if compliance_level is not None:
+        conditions.append(Domain.compliance_level == compliance_level)
+    return conditions
+
+
 @router.get("/domains", response_model=DomainListResponse, dependencies=[Depends(require_admin)])
 async def list_domains(
     skip: int = 0,
     limit: int = 50,
+    conditions: list = Depends(domain_filters),
     db: AsyncSession = Depends(get_db),
 ):
-    """List all domain records, paginated."""
-    total_result = await db.execute(select(func.count(Domain.id)))
+    """List domain records, paginated and optionally filtered."""
+    total_result = await db.execute(select(func.count(Domain.id)).where(*conditions))
     total = total_result.scalar_one()
 
     result = await db.execute(
-        select(Domain).order_by(Domain.created_at.desc()).offset(skip).limit(limit)
+        select(Domain).where(*conditions).order_by(Domain.created_at.desc()).offset(skip).limit(limit)
     )
     items = result.scalars().all()
     return DomainListResponse(total=total, items=list(items))
 
 
+@router.get("/domains/export", dependencies=[Depends(require_admin)])
+async def export_domains(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = Query(False, description="Compress the body on the fly (Content-Encoding: gzip)"),
+    conditions: list = Depends(domain_filters),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+):
+    """
+    Stream every matching domain record as NDJSON or CSV.
+    Memory use is constant: rows come from a server-side cursor and are
+    written out partition by partition, optionally gzip-compressed.
+    """
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = f"domains-{datetime.now(timezone.utc):%Y%m%d}.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_domains(session_factory, conditions, fmt, gzip),
+        media_type=media_type,
+        headers=headers,
+    )
+
+
 @router.post("/domains", response_model=DomainResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
 async def create_domain(
     payload: DomainCreate,
@@ -41,7 +87,8 @@ async def create_domain(
 ):
     """
     Create a new compliance record for a domain.
-    The record is signed with Ed25519 at creation time.
+    The record is signed with Ed25519 at creation time; an optional
+    expires_at is part of the signed payload.
     """
     # Check for duplicate
     existing = await db.execute(
@@ -54,11 +101,22 @@ async def create_domain(
         )
 
     issued_at = datetime.now(timezone.utc)
+    expires_at = payload.expires_at
+    if expires_at is not None:
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= issued_at:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="expires_at must be in the future.",
+            )
+
     signature, public_key = sign_domain(
         domain_name=payload.domain_name,
         status="active",
         compliance_level=payload.compliance_level,
         issued_at=issued_at,
+        expires_at=expires_at,
     )
 
     domain = Domain(
@@ -66,12 +124,14 @@ async def create_domain(
         status="active",
         compliance_level=payload.compliance_level,
         issued_at=issued_at,
+        expires_at=expires_at,
         signature=signature,
         public_key=public_key,
     )
     db.add(domain)
     await db.flush()
     await db.refresh(domain)
+    await publish_domain_event(db, DOMAIN_CREATED, domain)
     return domain
 
 
@@ -97,6 +157,7 @@ async def revoke_domain(
     domain.revoked_at = datetime.now(timezone.utc)
     await db.flush()
     await db.refresh(domain)
+    await publish_domain_event(db, DOMAIN_REVOKED, domain)
     return domain
 
 
@@ -105,9 +166,16 @@ async def delete_domain(
     domain_id: str,
     db: AsyncSession = Depends(get_db),
 ):
-    """Permanently delete a domain record."""
+    """
+    Delete a domain record.
+    With archive_on_delete enabled the record is moved to the archive instead
+    of disappearing without trace.
+    """
     result = await db.execute(select(Domain).where(Domain.id == domain_id))
     domain = result.scalar_one_or_none()
     if not domain:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Domain not found.")
+    await publish_domain_event(db, DOMAIN_DELETED, domain)
+    if settings.archive_on_delete:
+        archive_domain(db, domain, reason="deleted")
     await db.delete(domain)
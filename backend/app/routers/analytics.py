@@ -0,0 +1,48 @@
+"""
+Analytics router — /verify traffic rollups.
+All routes are protected by the X-Admin-Key header.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics import domain_timeseries, top_domains, window_start
+from app.auth import require_admin
+from app.database import get_db
+from app.schemas import TopDomainResponse, TimeseriesPoint, TimeseriesResponse
+
+router = APIRouter(prefix="/admin/analytics", tags=["Analytics"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/top", response_model=list[TopDomainResponse])
+async def most_verified_domains(
+    limit: int = Query(10, ge=1, le=1000),
+    hours: int = Query(24, ge=1, le=24 * 90, description="Look-back window"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Most verified domains over the last `hours`, with approximate distinct referrers."""
+    ranked = await top_domains(db, window_start(hours), limit)
+    return [
+        TopDomainResponse(domain=name, verify_count=count, unique_referrers=referrers)
+        for name, count, referrers in ranked
+    ]
+
+
+@router.get("/timeseries", response_model=TimeseriesResponse)
+async def verification_timeseries(
+    domain: str = Query(..., description="Domain name"),
+    hours: int = Query(24, ge=1, le=24 * 90, description="Look-back window"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Per-bucket verification counts for one domain over the last `hours`."""
+    until = datetime.now(timezone.utc) + timedelta(seconds=1)
+    points = await domain_timeseries(db, domain, window_start(hours), until)
+    return TimeseriesResponse(
+        domain=domain,
+        points=[
+            TimeseriesPoint(bucket_start=start, verify_count=count, unique_referrers=referrers)
+            for start, count, referrers in points
+        ],
+    )
@@ -2,58 +2,195 @@
 Public router — endpoints accessible without authentication.
 """
 
-from fastapi import APIRouter, HTTPException, Query, status
+import hashlib
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from fastapi import Depends
 
+from app.analytics import referrer_origin, verify_analytics
+from app.archival import lookup_records
+from app.cache import verify_cache
+from app.config import get_settings
 from app.database import get_db
-from app.models import Domain
-from app.schemas import VerifyResponse
-from app.crypto import verify_signature
+from app.schemas import (
+    PublicKeyResponse,
+    StapleBatchRequest,
+    StapleBatchResponse,
+    StapleResponse,
+    VerifyBatchRequest,
+    VerifyBatchResponse,
+    VerifyResponse,
+)
+from app.crypto import get_public_key_hex
+from app.ratelimit import limit_staple_batch, limit_verify, limit_verify_batch
+from app.staple import get_staples
+from app.verification import build_verify_response, response_cache_ttl
+
+settings = get_settings()
 
 router = APIRouter(tags=["Public"])
 
 
-@router.get("/verify", response_model=VerifyResponse)
+def verify_etag(response: VerifyResponse) -> str:
+    """Strong validator for a /verify answer; changes whenever any field does."""
+    return '"%s"' % hashlib.blake2b(response.model_dump_json().encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+
+def _record_verification(request: Request, domain: str) -> None:
+    if settings.analytics_enabled:
+        verify_analytics.record(
+            domain, referrer_origin(request.headers.get("origin"), request.headers.get("referer"))
+        )
+
+
+def _conditional(request: Request, response: Response, answer: VerifyResponse):
+    etag = verify_etag(answer)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return answer
+
+
+@router.get("/verify", response_model=VerifyResponse, dependencies=[Depends(limit_verify)])
 async def verify_domain(
+    request: Request,
+    response: Response,
     domain: str = Query(..., description="Domain name to verify (e.g. example.com)"),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Public endpoint to verify the compliance status of a domain.
 
-    - Looks up the domain record in the database.
+    - Rate-limited per client and capped in concurrency before a DB session is opened.
+    - Served from the in-process verify cache when possible.
+    - Otherwise looks up the domain record with archival.lookup_records(),
+      falling back to records archived by revocation on a miss.
     - Validates the Ed25519 signature before responding.
-    - Returns the full status including signature_valid field.
+    - Returns the full status including signature_valid field, with an ETag;
+      a matching If-None-Match gets 304 Not Modified.
+    - Counts the verification in memory for traffic analytics.
     """
-    result = await db.execute(
-        select(Domain).where(Domain.domain_name == domain)
-    )
-    record = result.scalar_one_or_none()
+    cached = verify_cache.get(domain)
+    if cached is not None:
+        _record_verification(request, domain)
+        return _conditional(request, response, cached)
 
+    generation = verify_cache.generation
+    # Same serving rules as the batch endpoint and stapling (archive fallback included)
+    record = (await lookup_records(db, [domain])).get(domain)
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No compliance record found for domain '{domain}'.",
         )
 
-    # Validate signature using the stored public key (private key NOT used here)
-    is_valid = verify_signature(
-        domain_name=record.domain_name,
-        status="active",          # signature was created against 'active' status
-        compliance_level=record.compliance_level,
-        issued_at=record.issued_at,
-        signature_hex=record.signature,
-        public_key_hex=record.public_key,
+    answer = build_verify_response(record)
+    verify_cache.set(domain, answer, generation, ttl=response_cache_ttl(answer))
+    _record_verification(request, domain)
+    return _conditional(request, response, answer)
+
+
+@router.post("/verify/batch", response_model=VerifyBatchResponse, dependencies=[Depends(limit_verify_batch)])
+async def verify_domains(
+    request: Request,
+    body: VerifyBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Verify up to verify_batch_max domains in one request. The rate limit
+    charges one token per distinct domain.
+
+    Cache misses are loaded with a single query. Answers whose ETag matches
+    the one supplied in `etags` are listed in `unchanged` instead of resent.
+    """
+    names = list(dict.fromkeys(body.domains))
+    answers: dict[str, VerifyResponse] = {}
+    misses = []
+    for name in names:
+        cached = verify_cache.get(name)
+        if cached is not None:
+            answers[name] = cached
+        else:
+            misses.append(name)
+
+    if misses:
+        generation = verify_cache.generation
+        for name, record in (await lookup_records(db, misses)).items():
+            answer = build_verify_response(record)
+            verify_cache.set(name, answer, generation, ttl=response_cache_ttl(answer))
+            answers[name] = answer
+
+    batch = VerifyBatchResponse(results=[], etags={}, unchanged=[], missing=[])
+    for name in names:
+        answer = answers.get(name)
+        if answer is None:
+            batch.missing.append(name)
+            continue
+        _record_verification(request, name)
+        etag = verify_etag(answer)
+        batch.etags[name] = etag
+        if body.etags.get(name) == etag:
+            batch.unchanged.append(name)
+        else:
+            batch.results.append(answer)
+    return batch
+
+
+def _staple_response(domain: str, claims: dict, token: str) -> StapleResponse:
+    return StapleResponse(
+        domain=domain,
+        status=claims["s"],
+        token=token,
+        expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc),
     )
 
-    return VerifyResponse(
-        domain=record.domain_name,
-        status=record.status,  # type: ignore[arg-type]
-        compliance_level=record.compliance_level,
-        issued_at=record.issued_at,
-        revoked_at=record.revoked_at,
-        signature_valid=is_valid,
-        public_key=record.public_key,
+
+@router.get("/staple", response_model=StapleResponse, dependencies=[Depends(limit_verify)])
+async def staple_domain(
+    response: Response,
+    domain: str = Query(..., description="Domain name to issue a status token for"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Issue a short-lived signed status token for a domain.
+
+    Domain owners fetch this periodically and embed the token in their
+    pages (data-token), so badge views are verified locally by badge.js.
+    Tokens are reused until shortly before they expire.
+    """
+    staples = await get_staples(db, [domain])
+    if domain not in staples:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No compliance record found for domain '{domain}'.",
+        )
+    token, claims = staples[domain]
+    remaining = claims["exp"] - int(datetime.now(timezone.utc).timestamp()) - settings.staple_refresh_margin
+    response.headers["Cache-Control"] = f"public, max-age={max(0, int(remaining))}"
+    return _staple_response(domain, claims, token)
+
+
+@router.post("/staple/batch", response_model=StapleBatchResponse, dependencies=[Depends(limit_staple_batch)])
+async def staple_domains(body: StapleBatchRequest, db: AsyncSession = Depends(get_db)):
+    """Issue status tokens for up to staple_batch_max domains in one request."""
+    staples = await get_staples(db, body.domains)
+    return StapleBatchResponse(
+        tokens=[_staple_response(name, claims, token) for name, (token, claims) in staples.items()],
+        missing=[name for name in dict.fromkeys(body.domains) if name not in staples],
     )
+
+
+@router.get("/public-key", response_model=PublicKeyResponse)
+async def public_key(response: Response):
+    """The Ed25519 public key that signs domain records and status tokens."""
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return PublicKeyResponse(public_key=get_public_key_hex())
@@ -0,0 +1,58 @@
+"""
+Webhooks router — registration of endpoints that receive domain events.
+All routes are protected by the X-Admin-Key header.
+"""
+
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+
+from app.database import get_db
+from app.models import WebhookEndpoint, WebhookOutbox
+from app.schemas import WebhookCreate, WebhookResponse, WebhookCreatedResponse
+from app.auth import require_admin
+
+router = APIRouter(prefix="/admin/webhooks", tags=["Webhooks"], dependencies=[Depends(require_admin)])
+
+
+@router.get("", response_model=list[WebhookResponse])
+async def list_webhooks(db: AsyncSession = Depends(get_db)):
+    """List registered webhook endpoints (secrets are not returned)."""
+    result = await db.execute(select(WebhookEndpoint).order_by(WebhookEndpoint.created_at))
+    return result.scalars().all()
+
+
+@router.post("", response_model=WebhookCreatedResponse, status_code=status.HTTP_201_CREATED)
+async def create_webhook(
+    payload: WebhookCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Register a webhook endpoint.
+    The generated signing secret is returned only in this response.
+    """
+    endpoint = WebhookEndpoint(
+        url=str(payload.url),
+        events=",".join(dict.fromkeys(payload.events)),
+        secret=secrets.token_hex(32),
+    )
+    db.add(endpoint)
+    await db.flush()
+    await db.refresh(endpoint)
+    return endpoint
+
+
+@router.delete("/{webhook_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook(
+    webhook_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """Remove a webhook endpoint and drop its undelivered events."""
+    result = await db.execute(select(WebhookEndpoint).where(WebhookEndpoint.id == webhook_id))
+    endpoint = result.scalar_one_or_none()
+    if not endpoint:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Webhook not found.")
+    await db.execute(delete(WebhookOutbox).where(WebhookOutbox.endpoint_id == webhook_id))
+    await db.delete(endpoint)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, HttpUrl
 
 
 # ─── Request Schemas ──────────────────────────────────────────────────────────
@@ -8,6 +8,25 @@ from pydantic import BaseModel, Field
 class DomainCreate(BaseModel):
     domain_name: str = Field(..., description="Domain name (e.g. example.com)", min_length=3, max_length=255)
     compliance_level: str = Field(..., description="Compliance tier (e.g. 'basic', 'advanced')", min_length=1, max_length=50)
+    expires_at: Optional[datetime] = Field(None, description="When the certification lapses (UTC if no offset given)")
+
+
+class VerifyBatchRequest(BaseModel):
+    domains: list[str] = Field(..., min_length=1, description="Domain names to verify")
+    etags: dict[str, str] = Field(
+        default_factory=dict, description="ETags of answers the caller already holds; unchanged ones are not resent"
+    )
+
+
+class StapleBatchRequest(BaseModel):
+    domains: list[str] = Field(..., min_length=1, description="Domain names to issue status tokens for")
+
+
+class WebhookCreate(BaseModel):
+    url: HttpUrl = Field(..., description="HTTPS endpoint that receives event batches")
+    events: list[Literal["domain.created", "domain.revoked", "domain.expired", "domain.deleted"]] = Field(
+        default=["domain.revoked"], min_length=1, description="Event types to deliver"
+    )
 
 
 # ─── Response Schemas ─────────────────────────────────────────────────────────
@@ -19,6 +38,7 @@ class DomainResponse(BaseModel):
     compliance_level: str
     issued_at: datetime
     revoked_at: Optional[datetime]
+    expires_at: Optional[datetime] = None
     signature: str
     public_key: str
     created_at: datetime
@@ -34,14 +54,75 @@ class DomainListResponse(BaseModel):
 
 class VerifyResponse(BaseModel):
     domain: str
-    status: Literal["active", "revoked"]
+    status: Literal["active", "revoked", "expired"]
     compliance_level: str
     issued_at: datetime
     revoked_at: Optional[datetime]
+    expires_at: Optional[datetime] = None
     signature_valid: bool
+    signature: str
+    public_key: str
+
+
+class VerifyBatchResponse(BaseModel):
+    results: list[VerifyResponse]
+    etags: dict[str, str]
+    unchanged: list[str]
+    missing: list[str]
+
+
+class StapleResponse(BaseModel):
+    domain: str
+    status: Literal["active", "revoked", "expired"]
+    token: str
+    expires_at: datetime
+
+
+class StapleBatchResponse(BaseModel):
+    tokens: list[StapleResponse]
+    missing: list[str]
+
+
+class PublicKeyResponse(BaseModel):
+    algorithm: Literal["Ed25519"] = "Ed25519"
     public_key: str
 
 
+class WebhookResponse(BaseModel):
+    id: str
+    url: str
+    events: list[str] = Field(validation_alias="event_types")
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class WebhookCreatedResponse(WebhookResponse):
+    # Only returned once, at registration time
+    secret: str
+
+
+class TopDomainResponse(BaseModel):
+    domain: str
+    verify_count: int
+    unique_referrers: int
+
+
+class TimeseriesPoint(BaseModel):
+    bucket_start: datetime
+    verify_count: int
+    unique_referrers: int
+
+
+class TimeseriesResponse(BaseModel):
+    domain: str
+    points: list[TimeseriesPoint]
+
+
 class HealthResponse(BaseModel):
     status: str
     version: str
+
+
+class ReadinessResponse(BaseModel):
+    status: Literal["ready", "warming_up"]
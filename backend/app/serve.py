@@ -0,0 +1,53 @@
+"""
+serve.py — Process manager entry point: `python -m app.serve`.
+
+Runs uvicorn with WORKERS processes (0 = one per CPU core). One-time
+startup work that must not race between workers — generating the signing
+key and, outside production, creating tables — is done here in the parent
+before any worker is spawned. Per-worker caches stay coherent through the
+change listener in app.notify.
+"""
+
+import asyncio
+import logging
+import os
+
+import uvicorn
+
+from app.config import get_settings
+from app.crypto import load_or_create_keypair
+from app.database import Base, engine
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def worker_count() -> int:
+    return settings.workers if settings.workers > 0 else (os.cpu_count() or 1)
+
+
+async def prepare() -> None:
+    if not settings.is_production:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    load_or_create_keypair()
+    asyncio.run(prepare())
+
+    workers = worker_count()
+    logger.info("Starting %d worker(s) on %s:%d", workers, settings.host, settings.port)
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
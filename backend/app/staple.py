@@ -0,0 +1,125 @@
+"""
+staple.py — Short-lived signed status tokens that domain owners serve themselves.
+
+OCSP-stapling style: instead of every badge view calling /verify, the domain
+owner periodically fetches a token for their domain and embeds it in the
+page; badge.js checks it locally against the published public key.
+
+Token format (compact, URL-safe):
+
+    base64url(payload) "." base64url(ed25519_signature)
+
+- payload is canonical JSON (sorted keys, no whitespace) with
+  d (domain), s (status), l (compliance level), iat and exp (Unix seconds).
+- The signature covers the ASCII bytes of the first segment and is made
+  with the same key as crypto.sign_domain. A base64url string can never
+  equal a canonical record payload (JSON), so the two cannot be confused.
+- exp is staple_ttl after issuance, but never later than the record's own
+  expires_at for an active record.
+
+Issued tokens are cached per domain until staple_refresh_margin before
+they expire, and evicted through cache.invalidate_domain() on any change,
+so a revocation is stapled on the owner's next refresh.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import nacl.exceptions
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archival import lookup_records
+from app.cache import staple_cache
+from app.config import get_settings
+from app.crypto import get_verify_key, get_public_key_hex, load_or_create_keypair
+from app.expiry import effective_status
+from app.models import ArchivedDomain, Domain
+
+settings = get_settings()
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def encode_token(claims: dict) -> str:
+    """Sign `claims` with the server key and return the compact token."""
+    payload = _b64url(json.dumps(claims, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    signature = load_or_create_keypair().sign(payload.encode("ascii")).signature
+    return f"{payload}.{_b64url(signature)}"
+
+
+def issue_token(record: Domain | ArchivedDomain, now: datetime | None = None) -> tuple[str, dict]:
+    """Build and sign a token for `record`. Returns (token, claims)."""
+    now = now or datetime.now(timezone.utc)
+    status = effective_status(record, now)
+    expires = now + timedelta(seconds=settings.staple_ttl)
+    if status == "active" and record.expires_at is not None:
+        expires = min(expires, _as_utc(record.expires_at))
+    claims = {
+        "d": record.domain_name,
+        "s": status,
+        "l": record.compliance_level,
+        "iat": int(now.timestamp()),
+        "exp": int(expires.timestamp()),
+    }
+    return encode_token(claims), claims
+
+
+def verify_token(token: str, public_key_hex: str | None = None, now: datetime | None = None) -> dict:
+    """
+    Check a token's signature and validity window and return its claims.
+    Raises ValueError if the token is malformed, forged or expired.
+    """
+    try:
+        payload, signature = token.split(".")
+        get_verify_key(public_key_hex or get_public_key_hex()).verify(
+            payload.encode("ascii"), _b64url_decode(signature)
+        )
+        claims = json.loads(_b64url_decode(payload))
+    except (ValueError, UnicodeEncodeError, nacl.exceptions.BadSignatureError) as exc:
+        raise ValueError(f"Invalid status token: {exc}") from exc
+
+    if claims.get("exp", 0) <= (now or datetime.now(timezone.utc)).timestamp():
+        raise ValueError("Status token has expired.")
+    return claims
+
+
+async def get_staples(db: AsyncSession, domain_names: list[str]) -> dict[str, tuple[str, dict]]:
+    """
+    Return {domain: (token, claims)} for every known domain in `domain_names`.
+
+    Cached tokens are reused; all misses are loaded with one query (plus one
+    against the archive for revoked records) and signed in a single pass.
+    """
+    staples: dict[str, tuple[str, dict]] = {}
+    missing = []
+    for name in dict.fromkeys(domain_names):
+        cached = staple_cache.get(name)
+        if cached is not None:
+            staples[name] = cached
+        else:
+            missing.append(name)
+    if not missing:
+        return staples
+
+    generation = staple_cache.generation
+    records = await lookup_records(db, missing)
+    now = datetime.now(timezone.utc)
+    for name, record in records.items():
+        token, claims = issue_token(record, now)
+        staples[name] = (token, claims)
+        staple_cache.set(
+            name, (token, claims), generation,
+            ttl=claims["exp"] - now.timestamp() - settings.staple_refresh_margin,
+        )
+    return staples
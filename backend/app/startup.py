@@ -0,0 +1,131 @@
+"""
+startup.py — Schema checks and warm-up run from the application lifespan.
+
+In production the schema belongs to Alembic: instead of create_all (which
+reflects every table on each boot) we compare the database revision with
+the migration head once and refuse to start on a mismatch.
+
+Warm-up runs in the background after startup so that the process can
+answer probes immediately; /ready reports 503 until it has finished:
+- opens db_pool_min pooled connections,
+- parses the signing and verify keys,
+- optionally preloads the warmup_preload_domains most verified records
+  (over the last warmup_window_hours) into the verify cache.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.analytics import top_domains, window_start
+from app.cache import verify_cache
+from app.config import get_settings
+from app.crypto import load_or_create_keypair, get_public_key_hex, get_verify_key
+from app.models import Domain
+from app.verification import build_verify_response, response_cache_ttl
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+class Readiness:
+    """Tracks whether warm-up has completed."""
+
+    def __init__(self) -> None:
+        self.ready = False
+
+    def reset(self) -> None:
+        self.ready = False
+
+
+readiness = Readiness()
+
+
+async def check_schema_revision(engine: AsyncEngine) -> None:
+    """Raise RuntimeError unless the database is at the Alembic head revision."""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    expected = set(ScriptDirectory.from_config(config).get_heads())
+
+    async with engine.connect() as conn:
+        current = set(
+            await conn.run_sync(lambda sync_conn: MigrationContext.configure(sync_conn).get_current_heads())
+        )
+
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(expected)}. "
+            "Run `alembic upgrade head` before starting the application."
+        )
+    logger.info("Database schema at revision %s", ", ".join(sorted(current)))
+
+
+def warm_keys() -> None:
+    """Load the signing key and pre-parse the matching verify key."""
+    load_or_create_keypair()
+    get_verify_key(get_public_key_hex())
+
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> None:
+    """Check out `connections` pooled connections at once so they stay open in the pool."""
+    if connections <= 0:
+        return
+
+    async def touch(conn_ready: asyncio.Event, release: asyncio.Event) -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            conn_ready.set()
+            await release.wait()
+
+    release = asyncio.Event()
+    ready = [asyncio.Event() for _ in range(connections)]
+    tasks = [asyncio.create_task(touch(r, release)) for r in ready]
+    try:
+        # Hold every connection until all are open, otherwise the pool just reuses one
+        await asyncio.gather(*(r.wait() for r in ready))
+    finally:
+        release.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def preload_verify_cache(session_factory: async_sessionmaker[AsyncSession], limit: int) -> int:
+    """
+    Load up to `limit` records into the verify cache, most verified first
+    according to the traffic rollups. Without traffic data yet, the most
+    recently issued records are used. Returns the number cached.
+    """
+    if limit <= 0:
+        return 0
+    async with session_factory() as session:
+        generation = verify_cache.generation
+        ranked = await top_domains(session, window_start(settings.warmup_window_hours), limit)
+        if ranked:
+            query = select(Domain).where(Domain.domain_name.in_([name for name, _, _ in ranked]))
+        else:
+            query = select(Domain).order_by(Domain.issued_at.desc()).limit(limit)
+        records = (await session.execute(query)).scalars().all()
+    for record in records:
+        response = build_verify_response(record)
+        verify_cache.set(record.domain_name, response, generation, ttl=response_cache_ttl(response))
+    return len(records)
+
+
+async def warm_up(engine: AsyncEngine, session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """Run every warm-up step, then mark the application ready."""
+    try:
+        await warm_pool(engine, min(settings.db_pool_min, settings.db_pool_size))
+        warm_keys()
+        cached = await preload_verify_cache(session_factory, settings.warmup_preload_domains)
+        logger.info("Warm-up complete (%d verify cache entries preloaded).", cached)
+    except Exception:
+        # A failed warm-up only costs latency; serve traffic anyway
+        logger.exception("Warm-up failed")
+    readiness.ready = True
@@ -0,0 +1,49 @@
+"""
+verification.py — Builds the public /verify answer for a domain record.
+
+Shared by the public router and the startup cache preload, so both cache
+exactly what the endpoint would have returned.
+"""
+
+from datetime import datetime, timezone
+
+from app.crypto import verify_signature
+from app.expiry import effective_status
+from app.models import ArchivedDomain, Domain
+from app.schemas import VerifyResponse
+
+
+def build_verify_response(record: Domain | ArchivedDomain) -> VerifyResponse:
+    """Validate a record's signature and build the public /verify response."""
+    # Validate signature using the stored public key (private key NOT used here)
+    is_valid = verify_signature(
+        domain_name=record.domain_name,
+        status="active",          # signature was created against 'active' status
+        compliance_level=record.compliance_level,
+        issued_at=record.issued_at,
+        signature_hex=record.signature,
+        public_key_hex=record.public_key,
+        expires_at=record.expires_at,
+    )
+
+    return VerifyResponse(
+        domain=record.domain_name,
+        status=effective_status(record),  # type: ignore[arg-type]
+        compliance_level=record.compliance_level,
+        issued_at=record.issued_at,
+        revoked_at=record.revoked_at,
+        expires_at=record.expires_at,
+        signature_valid=is_valid,
+        signature=record.signature,
+        public_key=record.public_key,
+    )
+
+
+def response_cache_ttl(response: VerifyResponse) -> float | None:
+    """Never cache an 'active' answer past the moment the record expires."""
+    if response.status != "active" or response.expires_at is None:
+        return None
+    expires_at = response.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
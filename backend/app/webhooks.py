@@ -0,0 +1,210 @@
+"""
+webhooks.py — Background delivery of domain events to registered endpoints.
+
+Design decisions:
+- Events are queued in the webhook_outbox table by app.events; this module
+  only reads the outbox, so admin requests never wait on a partner's server.
+- A single pooled httpx.AsyncClient is shared by all deliveries.
+- Pending events for the same endpoint are batched into one POST:
+  {"events": [<event>, ...]}.
+- Each endpoint has its own concurrency cap so one slow partner cannot
+  hog the connection pool.
+- Claimed rows are leased (next_attempt_at pushed forward) and selected
+  with SKIP LOCKED, so several workers can run dispatchers side by side.
+- Failures are retried with exponential backoff; after webhook_max_attempts
+  the row is marked 'failed' and left in the table.
+- Every request carries X-Webhook-Timestamp and
+  X-Webhook-Signature: sha256=HMAC(secret, "<timestamp>.<body>").
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import WebhookEndpoint, WebhookOutbox
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def sign_webhook_payload(secret: str, timestamp: str, body: bytes) -> str:
+    """Return the hex HMAC-SHA256 of "<timestamp>.<body>" keyed by the endpoint secret."""
+    message = timestamp.encode("ascii") + b"." + body
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt after `attempts` failures."""
+    return min(settings.webhook_backoff_base * (2 ** (attempts - 1)), settings.webhook_backoff_max)
+
+
+class WebhookDispatcher:
+    """Drains the webhook outbox in the background."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._client = client
+        self._owns_client = client is None
+        self._wakeup = asyncio.Event()
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        """Wake the dispatcher loop (called after a transaction queues events)."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.webhook_timeout,
+                limits=httpx.Limits(max_connections=settings.webhook_max_connections),
+            )
+        self._task = asyncio.create_task(self._run(), name="webhook-dispatcher")
+        logger.info("Webhook dispatcher started.")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.exception("Webhook dispatch pass failed")
+                claimed = 0
+            if claimed:
+                continue  # more rows may be due — go again straight away
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.webhook_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_once(self) -> int:
+        """
+        Claim due outbox rows, deliver them in per-endpoint batches and record
+        the outcome. Returns the number of rows claimed.
+        """
+        rows, endpoints = await self._claim()
+        if not rows:
+            return 0
+
+        by_endpoint: dict[str, list[WebhookOutbox]] = defaultdict(list)
+        for row in rows:
+            by_endpoint[row.endpoint_id].append(row)
+
+        deliveries = []
+        for endpoint_id, pending in by_endpoint.items():
+            endpoint = endpoints.get(endpoint_id)
+            size = settings.webhook_batch_size
+            for i in range(0, len(pending), size):
+                deliveries.append(self._deliver(endpoint, pending[i:i + size]))
+
+        outcomes = await asyncio.gather(*deliveries)
+        await self._record(outcomes)
+        return len(rows)
+
+    async def _claim(self) -> tuple[list[WebhookOutbox], dict[str, WebhookEndpoint]]:
+        now = datetime.now(timezone.utc)
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(WebhookOutbox)
+                .where(WebhookOutbox.status == "pending", WebhookOutbox.next_attempt_at <= now)
+                .order_by(WebhookOutbox.next_attempt_at)
+                .limit(settings.webhook_claim_limit)
+                .with_for_update(skip_locked=True)
+            )
+            rows = list(result.scalars().all())
+            if not rows:
+                return [], {}
+
+            lease_until = now + timedelta(seconds=settings.webhook_lease_seconds)
+            for row in rows:
+                row.next_attempt_at = lease_until
+
+            endpoint_ids = {row.endpoint_id for row in rows}
+            result = await session.execute(
+                select(WebhookEndpoint).where(WebhookEndpoint.id.in_(endpoint_ids))
+            )
+            endpoints = {ep.id: ep for ep in result.scalars().all()}
+            await session.commit()
+        return rows, endpoints
+
+    def _semaphore(self, endpoint_id: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(endpoint_id)
+        if sem is None:
+            sem = asyncio.Semaphore(settings.webhook_max_concurrency_per_endpoint)
+            self._semaphores[endpoint_id] = sem
+        return sem
+
+    async def _deliver(
+        self, endpoint: WebhookEndpoint | None, rows: list[WebhookOutbox]
+    ) -> tuple[list[str], str | None]:
+        """POST one batch. Returns (outbox ids, error or None on success)."""
+        ids = [row.id for row in rows]
+        if endpoint is None:
+            return ids, "endpoint no longer exists"
+
+        body = ('{"events":[' + ",".join(row.payload for row in rows) + "]}").encode("utf-8")
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Timestamp": timestamp,
+            "X-Webhook-Signature": "sha256=" + sign_webhook_payload(endpoint.secret, timestamp, body),
+        }
+        async with self._semaphore(endpoint.id):
+            try:
+                response = await self._client.post(endpoint.url, content=body, headers=headers)
+            except httpx.HTTPError as exc:
+                return ids, f"{type(exc).__name__}: {exc}"
+        if response.is_success:
+            return ids, None
+        return ids, f"HTTP {response.status_code}"
+
+    async def _record(self, outcomes: list[tuple[list[str], str | None]]) -> None:
+        delivered = [i for ids, error in outcomes if error is None for i in ids]
+        errors = {i: error for ids, error in outcomes if error is not None for i in ids}
+        now = datetime.now(timezone.utc)
+
+        async with self._session_factory() as session:
+            if delivered:
+                await session.execute(delete(WebhookOutbox).where(WebhookOutbox.id.in_(delivered)))
+            if errors:
+                result = await session.execute(
+                    select(WebhookOutbox).where(WebhookOutbox.id.in_(errors.keys()))
+                )
+                for row in result.scalars().all():
+                    row.attempts += 1
+                    row.last_error = errors[row.id]
+                    if row.attempts >= settings.webhook_max_attempts:
+                        row.status = "failed"
+                        logger.warning("Webhook %s gave up after %d attempts: %s", row.id, row.attempts, row.last_error)
+                    else:
+                        row.next_attempt_at = now + timedelta(seconds=backoff_delay(row.attempts))
+            await session.commit()
+
+
+dispatcher = WebhookDispatcher()
@@ -0,0 +1,14 @@
+"""
+compliance_client — Bulk verifier for the Compliance Status API.
+
+    async with ComplianceClient("https://api.example.com", cache_path="verify-cache.db") as client:
+        async for result in client.verify_many(domains):
+            ...
+
+Command line: python -m compliance_client --help
+"""
+
+from compliance_client.cache import ETagCache
+from compliance_client.client import ComplianceClient, verify_answer
+
+__all__ = ["ComplianceClient", "ETagCache", "verify_answer"]
@@ -0,0 +1,69 @@
+"""
+__main__.py — Command line verifier: `python -m compliance_client`.
+
+Reads domain names (one per line, blank lines and # comments ignored) from
+a file or stdin and writes one JSON result per line (NDJSON) to stdout.
+Exits with status 1 if any domain could not be verified because of an error.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Iterable, TextIO
+
+from compliance_client.client import ComplianceClient
+
+
+def read_domains(stream: TextIO) -> Iterable[str]:
+    for line in stream:
+        domain = line.strip()
+        if domain and not domain.startswith("#"):
+            yield domain
+
+
+async def run(domains: Iterable[str], out: TextIO, **client_options) -> int:
+    """Verify `domains` and write NDJSON results to `out`. Returns the exit status."""
+    failed = False
+    async with ComplianceClient(**client_options) as client:
+        async for result in client.verify_many(domains):
+            failed = failed or "error" in result
+            out.write(json.dumps(result, separators=(",", ":")) + "\n")
+    out.flush()
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m compliance_client", description=__doc__.split("\n\n")[1])
+    parser.add_argument("input", nargs="?", default="-", help="file with one domain per line (default: stdin)")
+    parser.add_argument("--api", default=os.environ.get("COMPLIANCE_API_URL", "http://localhost:8000"),
+                        help="API base URL (env COMPLIANCE_API_URL)")
+    parser.add_argument("--api-token", default=os.environ.get("COMPLIANCE_API_TOKEN"),
+                        help="X-API-Token for higher rate limits (env COMPLIANCE_API_TOKEN)")
+    parser.add_argument("--public-key", help="expected signing key (hex, from GET /public-key)")
+    parser.add_argument("--cache", help="SQLite file for the ETag cache (disabled if omitted)")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight (default: 8)")
+    parser.add_argument("--batch-size", type=int, default=100, help="domains per batch request (default: 100)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    options = dict(
+        base_url=args.api,
+        api_token=args.api_token,
+        public_key=args.public_key,
+        cache_path=args.cache,
+        max_concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        timeout=args.timeout,
+    )
+    if args.input == "-":
+        return asyncio.run(run(read_domains(sys.stdin), sys.stdout, **options))
+    with open(args.input, encoding="utf-8") as stream:
+        return asyncio.run(run(read_domains(stream), sys.stdout, **options))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+cache.py — On-disk store of /verify answers keyed by domain, with their ETags.
+
+A single SQLite file (stdlib sqlite3) rather than a file per domain, so a
+cache covering millions of domains stays one file and lookups for a whole
+batch are one indexed query. Calls are synchronous: they are local and
+sub-millisecond per batch, small next to the HTTP round trip they save.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+# Domains per IN (...) lookup, below SQLite's default bind-parameter limit
+_CHUNK = 500
+
+
+class ETagCache:
+    """Persistent mapping of domain -> (etag, answer)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "domain TEXT PRIMARY KEY, etag TEXT NOT NULL, body TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def get_many(self, domains: list[str]) -> dict[str, tuple[str, dict]]:
+        found: dict[str, tuple[str, dict]] = {}
+        for i in range(0, len(domains), _CHUNK):
+            chunk = domains[i:i + _CHUNK]
+            rows = self._db.execute(
+                f"SELECT domain, etag, body FROM answers WHERE domain IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for domain, etag, body in rows:
+                found[domain] = (etag, json.loads(body))
+        return found
+
+    def put_many(self, entries: list[tuple[str, str, dict]]) -> None:
+        """Store (domain, etag, answer) entries, replacing older ones."""
+        if not entries:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO answers (domain, etag, body) VALUES (?, ?, ?)",
+            [(domain, etag, json.dumps(body, separators=(",", ":"))) for domain, etag, body in entries],
+        )
+        self._db.commit()
+
+    def discard_many(self, domains: list[str]) -> None:
+        if not domains:
+            return
+        self._db.executemany("DELETE FROM answers WHERE domain = ?", [(d,) for d in domains])
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,216 @@
+"""
+client.py — Async client for bulk verification against the Compliance Status API.
+
+Design decisions:
+- One pooled httpx.AsyncClient; at most max_concurrency requests in flight.
+- Domains are sent in chunks of batch_size to POST /verify/batch. Servers
+  without that endpoint (404/405) are detected once and served with
+  individual GET /verify calls instead.
+- With a cache, every request is conditional: the batch call sends the
+  known ETags and only changed answers come back; GET /verify sends
+  If-None-Match and a 304 reuses the stored answer.
+- Every answer is re-verified locally with app.crypto.verify_signature,
+  the same canonicalization the server signs with. Pass the published
+  public key (GET /public-key) to also pin the signing key.
+- 429 / 503 responses are retried after their Retry-After delay.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, Iterable
+
+import httpx
+
+from app.crypto import verify_signature
+from compliance_client.cache import ETagCache
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = {429, 503}
+_MAX_RETRY_AFTER = 30.0
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def verify_answer(answer: dict, public_key: str | None = None) -> bool:
+    """
+    Re-check the Ed25519 signature of a /verify answer locally.
+    With `public_key`, the answer must also be signed by that key.
+    """
+    if not answer.get("signature"):
+        return False
+    if public_key is not None and answer.get("public_key") != public_key:
+        return False
+    return verify_signature(
+        domain_name=answer["domain"],
+        status="active",          # records are signed against 'active' status
+        compliance_level=answer["compliance_level"],
+        issued_at=_parse_time(answer["issued_at"]),
+        signature_hex=answer["signature"],
+        public_key_hex=answer["public_key"],
+        expires_at=_parse_time(answer.get("expires_at")),
+    )
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return default
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterable[list[str]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ComplianceClient:
+    """Pooled, bounded-concurrency verifier. Use as an async context manager."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        max_concurrency: int = 8,
+        batch_size: int = 100,
+        cache_path: str | None = None,
+        public_key: str | None = None,
+        api_token: str | None = None,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        headers = {"X-API-Token": api_token} if api_token else {}
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            transport=transport,
+        )
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._batch_size = batch_size
+        self._cache = ETagCache(cache_path) if cache_path else None
+        self._public_key = public_key
+        self._max_retries = max_retries
+        self._batch_supported: bool | None = None
+
+    async def __aenter__(self) -> "ComplianceClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+        if self._cache is not None:
+            self._cache.close()
+
+    async def verify(self, domain: str) -> dict:
+        """Verify a single domain (conditional GET /verify)."""
+        cached = self._cache.get_many([domain]) if self._cache else {}
+        return await self._verify_one(domain, cached.get(domain))
+
+    async def verify_many(self, domains: Iterable[str]) -> AsyncIterator[dict]:
+        """
+        Verify every domain in `domains` and yield one result per domain,
+        in completion order. The iterable is consumed lazily, so inputs of
+        any size run in constant memory.
+        """
+        pending: set[asyncio.Task] = set()
+        for chunk in _chunked(domains, self._batch_size):
+            if len(pending) >= self._max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for result in task.result():
+                        yield result
+            pending.add(asyncio.create_task(self._verify_chunk(chunk)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for result in task.result():
+                    yield result
+
+    async def _verify_chunk(self, chunk: list[str]) -> list[dict]:
+        try:
+            cached = self._cache.get_many(chunk) if self._cache else {}
+            if self._batch_supported is not False and len(chunk) > 1:
+                results = await self._verify_batch(chunk, cached)
+                if results is not None:
+                    return results
+            return list(await asyncio.gather(*(self._verify_one(d, cached.get(d)) for d in chunk)))
+        except Exception as exc:
+            logger.warning("Verification of %d domain(s) failed: %s", len(chunk), exc)
+            return [{"domain": domain, "error": str(exc)} for domain in chunk]
+
+    async def _verify_batch(self, chunk: list[str], cached: dict[str, tuple[str, dict]]) -> list[dict] | None:
+        """POST /verify/batch. Returns None if the server has no batch endpoint."""
+        response = await self._request(
+            "POST", "/verify/batch",
+            json={"domains": chunk, "etags": {d: etag for d, (etag, _) in cached.items()}},
+        )
+        if response.status_code in (404, 405):
+            self._batch_supported = False
+            return None
+        response.raise_for_status()
+        self._batch_supported = True
+        data = response.json()
+
+        answers = {answer["domain"]: answer for answer in data["results"]}
+        unchanged = set(data["unchanged"])
+        for domain in unchanged:
+            answers[domain] = cached[domain][1]
+        if self._cache is not None:
+            self._cache.put_many([(a["domain"], data["etags"][a["domain"]], a) for a in data["results"]])
+            self._cache.discard_many(data["missing"])
+        return [self._result(domain, answers.get(domain), cached=domain in unchanged) for domain in chunk]
+
+    async def _verify_one(self, domain: str, cached: tuple[str, dict] | None) -> dict:
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = await self._request("GET", "/verify", params={"domain": domain}, headers=headers)
+        if response.status_code == 304 and cached:
+            return self._result(domain, cached[1], cached=True)
+        if response.status_code == 404:
+            if self._cache is not None:
+                self._cache.discard_many([domain])
+            return self._result(domain, None)
+        response.raise_for_status()
+        answer = response.json()
+        if self._cache is not None and response.headers.get("etag"):
+            self._cache.put_many([(domain, response.headers["etag"], answer)])
+        return self._result(domain, answer)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request within the concurrency bound, retrying 429 / 503 and transport errors."""
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                try:
+                    response = await self._http.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    if attempt >= self._max_retries:
+                        raise
+                    delay = 2.0 ** attempt
+                else:
+                    if response.status_code not in _RETRY_STATUSES or attempt >= self._max_retries:
+                        return response
+                    delay = _retry_after(response, default=2.0 ** attempt)
+            attempt += 1
+            # Sleep outside the semaphore so other requests can proceed meanwhile
+            await asyncio.sleep(min(delay, _MAX_RETRY_AFTER))
+
+    def _result(self, domain: str, answer: dict | None, cached: bool = False) -> dict:
+        if answer is None:
+            return {"domain": domain, "found": False}
+        return {
+            **answer,
+            "found": True,
+            "verified": verify_answer(answer, self._public_key),
+            "cached": cached,
+        }
@@ -0,0 +1,76 @@
+"""
+conftest.py — Shared test fixtures.
+Uses an async SQLite database so no real PostgreSQL needed.
+"""
+
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.main import app
+from app.config import get_settings
+from app.database import Base, get_db, get_session_factory
+from app import ratelimit
+from app.cache import staple_cache, verify_cache
+
+settings = get_settings()
+
+ADMIN_HEADERS = {"X-Admin-Key": settings.secret_admin_key}
+
+# ─── Override DB with async SQLite for tests ──────────────────────────────────
+TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+
+test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+TestSessionLocal = async_sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def override_get_db():
+    async with TestSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: TestSessionLocal
+
+
+@pytest_asyncio.fixture(scope="function", autouse=True)
+async def setup_db():
+    """Create all tables before each test, drop after."""
+    ratelimit.rate_limit_backend.clear()
+    verify_cache.clear()
+    staple_cache.clear()
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Session factory bound to the test database, for background services."""
+    return TestSessionLocal
+
+
+@pytest_asyncio.fixture
+async def db_engine():
+    """Engine bound to the test database."""
+    return test_engine
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+async def create_domain(client: AsyncClient, name: str, compliance_level: str = "basic", **fields) -> str:
+    """Create a domain record through the admin API and return its id."""
+    r = await client.post(
+        "/admin/domains",
+        json={"domain_name": name, "compliance_level": compliance_level, **fields},
+        headers=ADMIN_HEADERS,
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
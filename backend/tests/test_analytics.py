@@ -0,0 +1,130 @@
+"""
+test_analytics.py — In-memory /verify counters, HyperLogLog sketches and rollup queries.
+"""
+
+import sqlite3
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from sqlalchemy import event, select
+
+from app.main import app
+from app.analytics import HyperLogLog, VerifyAnalytics
+from app.cache import verify_cache
+from app.models import VerifyRollup
+from app.routers import public
+from app.startup import preload_verify_cache
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+
+@pytest.fixture
+def analytics(session_factory, monkeypatch):
+    aggregator = VerifyAnalytics(session_factory)
+    monkeypatch.setattr(public, "verify_analytics", aggregator)
+    return aggregator
+
+
+def test_hyperloglog_estimate_and_round_trip():
+    sketch = HyperLogLog()
+    for i in range(20_000):
+        sketch.add(f"https://site-{i}.example")
+    estimate = sketch.count()
+    assert abs(estimate - 20_000) / 20_000 < 0.1
+
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.count() == estimate
+
+
+def test_hyperloglog_is_exact_while_sparse_and_merges():
+    a, b = HyperLogLog(), HyperLogLog()
+    for origin in ("https://a.test", "https://b.test", "https://a.test"):
+        a.add(origin)
+    b.add("https://c.test")
+    a.merge(b)
+    assert a.count() == 3
+    assert len(a.to_bytes()) == 1 + 3 * 8
+
+
+@pytest.mark.asyncio
+async def test_flushes_are_added_into_rollups(analytics, session_factory):
+    analytics.record("busy.com", "https://shop.test")
+    analytics.record("busy.com", "https://shop.test")
+    analytics.record("quiet.com", None)
+    assert await analytics.flush() == 2
+
+    analytics.record("busy.com", "https://blog.test")
+    assert await analytics.flush() == 1
+    assert await analytics.flush() == 0
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.get("/admin/analytics/top?limit=5", headers=ADMIN_HEADERS)
+    assert r.status_code == 200
+    assert r.json() == [
+        {"domain": "busy.com", "verify_count": 3, "unique_referrers": 2},
+        {"domain": "quiet.com", "verify_count": 1, "unique_referrers": 0},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_flushes_merge_sketches(analytics, session_factory, db_engine):
+    other = HyperLogLog()
+    other.add("https://other-worker.test")
+    fired = []
+
+    def other_worker_inserts(conn, cursor, statement, parameters, context, executemany):
+        # Another worker creates the same rollup row just before this flush writes
+        if fired or not statement.startswith("INSERT INTO verify_rollups"):
+            return
+        fired.append(True)
+        with sqlite3.connect("test.db") as other_conn:
+            other_conn.execute(
+                "INSERT INTO verify_rollups (domain_name, bucket_start, verify_count, referrer_sketch) VALUES (?, ?, 1, ?)",
+                ("new.com", parameters[1], other.to_bytes()),
+            )
+
+    analytics.record("new.com", "https://this-worker.test")
+    event.listen(db_engine.sync_engine, "before_cursor_execute", other_worker_inserts)
+    try:
+        await analytics.flush()
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", other_worker_inserts)
+
+    async with session_factory() as session:
+        count, sketch = (await session.execute(
+            select(VerifyRollup.verify_count, VerifyRollup.referrer_sketch)
+        )).one()
+    assert fired
+    assert count == 2
+    assert HyperLogLog.from_bytes(sketch).count() == 2
+
+
+@pytest.mark.asyncio
+async def test_verify_requests_feed_timeseries(analytics):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await create_domain(client, "counted.com")
+        for origin in ("https://a.test", "https://b.test", "https://a.test"):
+            await client.get("/verify?domain=counted.com", headers={"Origin": origin})
+        # Unknown domains are not counted
+        await client.get("/verify?domain=missing.com")
+        await analytics.flush()
+
+        r = await client.get("/admin/analytics/timeseries?domain=counted.com", headers=ADMIN_HEADERS)
+    points = r.json()["points"]
+    assert len(points) == 1
+    assert points[0]["verify_count"] == 3
+    assert points[0]["unique_referrers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_preload_prefers_most_verified_domains(analytics, session_factory):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for name in ("popular.com", "ignored.com"):
+            await create_domain(client, name)
+    analytics.record("popular.com", None)
+    await analytics.flush()
+
+    verify_cache.clear()
+    assert await preload_verify_cache(session_factory, limit=1) == 1
+    assert verify_cache.get("popular.com") is not None
+    assert verify_cache.get("ignored.com") is None
@@ -4,48 +4,16 @@ Uses an in-memory SQLite database so no real PostgreSQL needed.
 """
 
 import pytest
-import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from app.main import app
-from app.database import Base, get_db
 from app.config import get_settings
 
 settings = get_settings()
 
-# ─── Override DB with async SQLite for tests ──────────────────────────────────
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
-
-test_engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-TestSessionLocal = async_sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
-
-
-async def override_get_db():
-    async with TestSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-
-
-app.dependency_overrides[get_db] = override_get_db
-
 ADMIN_HEADERS = {"X-Admin-Key": settings.secret_admin_key}
 
 
-@pytest_asyncio.fixture(scope="function", autouse=True)
-async def setup_db():
-    """Create all tables before each test, drop after."""
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-
 @pytest.mark.asyncio
 async def test_health_check():
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
@@ -0,0 +1,91 @@
+"""
+test_archival.py — Moving revoked and deleted records to the archive table.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select, update
+
+from app.main import app
+from app.archival import archive_revoked
+from app.models import ArchivedDomain, Domain
+from app.routers import admin
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+
+@pytest.mark.asyncio
+async def test_old_revoked_records_move_to_archive_in_batches(session_factory):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for name in ("old-1.com", "old-2.com", "old-3.com", "recent.com"):
+            domain_id = await create_domain(client, name)
+            await client.patch(f"/admin/domains/{domain_id}/revoke", headers=ADMIN_HEADERS)
+        await create_domain(client, "active.com")
+
+    long_ago = datetime.now(timezone.utc) - timedelta(days=400)
+    async with session_factory() as session:
+        await session.execute(
+            update(Domain).where(Domain.domain_name.like("old-%")).values(revoked_at=long_ago)
+        )
+        await session.commit()
+
+    moved = await archive_revoked(session_factory, older_than=timedelta(days=90), batch_size=2)
+    assert moved == 3
+
+    async with session_factory() as session:
+        hot = (await session.execute(select(Domain.domain_name))).scalars().all()
+        cold = (await session.execute(select(ArchivedDomain))).scalars().all()
+    assert sorted(hot) == ["active.com", "recent.com"]
+    assert sorted(a.domain_name for a in cold) == ["old-1.com", "old-2.com", "old-3.com"]
+    assert {a.archive_reason for a in cold} == {"revoked"}
+
+
+@pytest.mark.asyncio
+async def test_verify_falls_back_to_archive(session_factory):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        domain_id = await create_domain(client, "archived.com")
+        await client.patch(f"/admin/domains/{domain_id}/revoke", headers=ADMIN_HEADERS)
+        assert await archive_revoked(session_factory, older_than=timedelta(0)) == 1
+
+        r = await client.get("/verify?domain=archived.com")
+    assert r.status_code == 200
+    assert r.json()["status"] == "revoked"
+    assert r.json()["signature_valid"] is True
+
+
+@pytest.mark.asyncio
+async def test_delete_moves_record_to_archive_when_enabled(session_factory, monkeypatch):
+    monkeypatch.setattr(admin.settings, "archive_on_delete", True)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        domain_id = await create_domain(client, "gone.com")
+        r = await client.delete(f"/admin/domains/{domain_id}", headers=ADMIN_HEADERS)
+        # Deleted records are kept for audit but not served publicly
+        verify = await client.get("/verify?domain=gone.com")
+    assert r.status_code == 204
+    assert verify.status_code == 404
+
+    async with session_factory() as session:
+        archived = (await session.execute(select(ArchivedDomain))).scalar_one()
+    assert archived.id == domain_id
+    assert archived.archive_reason == "deleted"
+
+
+@pytest.mark.asyncio
+async def test_deleted_revoked_record_is_not_served(session_factory, monkeypatch):
+    monkeypatch.setattr(admin.settings, "archive_on_delete", True)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        domain_id = await create_domain(client, "revoked-then-deleted.com")
+        await client.patch(f"/admin/domains/{domain_id}/revoke", headers=ADMIN_HEADERS)
+        await client.delete(f"/admin/domains/{domain_id}", headers=ADMIN_HEADERS)
+
+        verify = await client.get("/verify?domain=revoked-then-deleted.com")
+        batch = await client.post("/verify/batch", json={"domains": ["revoked-then-deleted.com"]})
+        staple = await client.get("/staple?domain=revoked-then-deleted.com")
+
+    async with session_factory() as session:
+        archived = (await session.execute(select(ArchivedDomain))).scalar_one()
+    assert (archived.status, archived.archive_reason) == ("revoked", "deleted")
+    assert verify.status_code == 404
+    assert batch.json()["missing"] == ["revoked-then-deleted.com"]
+    assert staple.status_code == 404
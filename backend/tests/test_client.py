@@ -0,0 +1,102 @@
+"""
+test_client.py — The bulk verifier client and CLI, run against the app over ASGI.
+"""
+
+import io
+import json
+
+import httpx
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from compliance_client import ComplianceClient, verify_answer
+from compliance_client.__main__ import run
+from tests.conftest import create_domain
+
+
+async def create_domains(*names: str) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for name in names:
+            await create_domain(client, name)
+
+
+class NoBatchTransport(ASGITransport):
+    """An API deployment that predates POST /verify/batch."""
+
+    def __init__(self) -> None:
+        super().__init__(app=app)
+        self.paths: list[str] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        if request.url.path == "/verify/batch":
+            return httpx.Response(404, json={"detail": "Not Found"})
+        return await super().handle_async_request(request)
+
+
+@pytest.mark.asyncio
+async def test_verify_conditional_and_batch_requests():
+    await create_domains("etag.com")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/verify?domain=etag.com")
+        again = await client.get("/verify?domain=etag.com", headers={"If-None-Match": first.headers["etag"]})
+        batch = await client.post(
+            "/verify/batch", json={"domains": ["etag.com", "nope.com"], "etags": {"etag.com": first.headers["etag"]}}
+        )
+
+    assert first.status_code == 200
+    assert verify_answer(first.json())
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+    assert batch.json() == {
+        "results": [], "etags": {"etag.com": first.headers["etag"]}, "unchanged": ["etag.com"], "missing": ["nope.com"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_client_batches_and_reuses_its_etag_cache(tmp_path):
+    names = [f"bulk{i}.com" for i in range(5)]
+    await create_domains(*names)
+    options = dict(transport=ASGITransport(app=app), cache_path=str(tmp_path / "cache.db"), batch_size=2, max_concurrency=2)
+
+    async with ComplianceClient("http://test", **options) as client:
+        first = {r["domain"]: r for r in [r async for r in client.verify_many(names + ["unknown.com"])]}
+    async with ComplianceClient("http://test", **options) as client:
+        second = {r["domain"]: r for r in [r async for r in client.verify_many(names)]}
+
+    assert first["unknown.com"] == {"domain": "unknown.com", "found": False}
+    assert all(first[n]["verified"] and not first[n]["cached"] for n in names)
+    assert all(second[n]["verified"] and second[n]["cached"] for n in names)
+    assert second["bulk0.com"]["status"] == "active"
+
+
+@pytest.mark.asyncio
+async def test_client_falls_back_to_conditional_gets(tmp_path):
+    await create_domains("a.com", "b.com")
+    transport = NoBatchTransport()
+    async with ComplianceClient("http://test", transport=transport, cache_path=str(tmp_path / "c.db")) as client:
+        results = [r async for r in client.verify_many(["a.com", "b.com"])]
+        again = await client.verify("a.com")
+
+    assert sorted(r["domain"] for r in results) == ["a.com", "b.com"]
+    assert transport.paths.count("/verify/batch") == 1
+    assert again["cached"] and again["verified"]
+
+
+@pytest.mark.asyncio
+async def test_cli_writes_ndjson_and_checks_the_pinned_key():
+    await create_domains("cli.com")
+    out = io.StringIO()
+    status = await run(
+        ["cli.com", "missing.com"], out,
+        base_url="http://test", transport=ASGITransport(app=app), public_key="00" * 32,
+    )
+    lines = {r["domain"]: r for r in map(json.loads, out.getvalue().splitlines())}
+
+    assert status == 0
+    assert lines["missing.com"]["found"] is False
+    # Signed by a different key than the pinned one
+    assert lines["cli.com"]["found"] is True and lines["cli.com"]["verified"] is False
+    tampered = {**lines["cli.com"], "compliance_level": "advanced"}
+    assert verify_answer(lines["cli.com"]) and not verify_answer(tampered)
@@ -2,8 +2,12 @@
 test_crypto.py — Unit tests for the Ed25519 signing/verification module.
 """
 
+import os
+
+import nacl.signing
 import pytest
 from datetime import datetime, timezone
+from app import crypto
 from app.crypto import sign_domain, verify_signature, build_canonical_payload
 
 
@@ -67,3 +71,43 @@ def test_verify_fails_with_wrong_public_key():
     ).decode()
     result = verify_signature("example.com", "active", "basic", ISSUED_AT, sig, wrong_pub)
     assert result is False
+
+
+def test_expiry_is_signed_only_when_set():
+    expires_at = datetime(2027, 2, 24, 12, 0, 0, tzinfo=timezone.utc)
+    assert b"expires_at" not in build_canonical_payload("example.com", "active", "basic", ISSUED_AT)
+
+    sig, pub = sign_domain("example.com", "active", "basic", ISSUED_AT, expires_at)
+    assert verify_signature("example.com", "active", "basic", ISSUED_AT, sig, pub, expires_at=expires_at)
+    # Dropping or moving the expiry invalidates the signature
+    assert not verify_signature("example.com", "active", "basic", ISSUED_AT, sig, pub)
+    later = datetime(2028, 2, 24, 12, 0, 0, tzinfo=timezone.utc)
+    assert not verify_signature("example.com", "active", "basic", ISSUED_AT, sig, pub, expires_at=later)
+
+
+def test_key_file_is_created_atomically(tmp_path, monkeypatch):
+    key_path = tmp_path / "keys" / "private_key.bin"
+    monkeypatch.setattr(crypto.settings, "private_key_path", str(key_path))
+    monkeypatch.setattr(crypto, "_signing_key", None)
+
+    key = crypto.load_or_create_keypair()
+    assert key_path.read_bytes() == bytes(key)
+    assert [p.name for p in key_path.parent.iterdir()] == ["private_key.bin"]
+
+
+def test_worker_losing_the_key_race_loads_the_winners_key(tmp_path, monkeypatch):
+    key_path = tmp_path / "private_key.bin"
+    winner = nacl.signing.SigningKey.generate()
+    monkeypatch.setattr(crypto.settings, "private_key_path", str(key_path))
+    monkeypatch.setattr(crypto, "_signing_key", None)
+
+    real_link = os.link
+
+    def link_after_winner(src, dst):
+        # Another worker publishes its complete key between our exists() check and link()
+        key_path.write_bytes(bytes(winner))
+        return real_link(src, dst)
+
+    monkeypatch.setattr(crypto.os, "link", link_after_winner)
+    assert bytes(crypto.load_or_create_keypair()) == bytes(winner)
+    assert [p.name for p in tmp_path.iterdir()] == ["private_key.bin"]
@@ -0,0 +1,138 @@
+"""
+test_dns_publisher.py — TXT zone generation, checked by parsing the zones with dnspython.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import update
+
+from app.main import app
+from app.config import get_settings
+from app.crypto import verify_signature
+from app import dns_publisher
+from app.dns_publisher import parse_txt, publish
+from app.models import Domain
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+dns_zone = pytest.importorskip("dns.zone")
+
+settings = get_settings()
+
+
+def load_zone(path):
+    return dns_zone.from_file(str(path), origin=settings.dns_zone, relativize=True)
+
+
+def txt_fields(zone, name: str) -> dict[str, str]:
+    rdataset = zone.find_rdataset(name, "TXT")
+    return parse_txt(b"".join(next(iter(rdataset)).strings).decode("ascii"))
+
+
+def signature_checks_out(fields: dict[str, str]) -> bool:
+    return verify_signature(
+        domain_name=fields["d"],
+        status="active",
+        compliance_level=fields["l"],
+        issued_at=datetime.fromisoformat(fields["i"]),
+        signature_hex=fields["sig"],
+        public_key_hex=fields["k"],
+        expires_at=datetime.fromisoformat(fields["e"]) if "e" in fields else None,
+    )
+
+
+def fqdn(name: str) -> str:
+    return f"{name}.{settings.dns_zone}"
+
+
+@pytest.mark.asyncio
+async def test_zone_contains_verifiable_txt_records(session_factory, tmp_path):
+    expires_at = (datetime.now(timezone.utc) + timedelta(days=30)).replace(microsecond=0)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await create_domain(client, "plain.com", compliance_level="tier 2; EU")
+        await create_domain(client, "dated.com", expires_at=expires_at.isoformat())
+        revoked_id = await create_domain(client, "gone.com")
+        await client.patch(f"/admin/domains/{revoked_id}/revoke", headers=ADMIN_HEADERS)
+        await create_domain(client, "not a dns name")
+
+    counts = await publish(session_factory, tmp_path / "z.zone", tmp_path / "state.json")
+    zone = load_zone(tmp_path / "z.zone")
+
+    assert counts["records"] == 3 and counts["added"] == 3 and counts["skipped"] == 1
+    assert zone.find_rdataset("@", "SOA")[0].serial == counts["serial"]
+    for name in ("plain.com", "dated.com", "gone.com"):
+        fields = txt_fields(zone, name)
+        assert fields["d"] == name
+        assert signature_checks_out(fields)
+    assert txt_fields(zone, "plain.com")["l"] == "tier 2; EU"
+    assert txt_fields(zone, "dated.com")["e"] == expires_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    assert txt_fields(zone, "gone.com")["s"] == "revoked"
+    assert "r" in txt_fields(zone, "gone.com")
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_publishes_only_changes(session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(dns_publisher, "YIELD_PER", 1)  # interleave fetches from both streams
+    zone_path, state_path = tmp_path / "z.zone", tmp_path / "state.json"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        revoke_id = await create_domain(client, "a.com")
+        delete_id = await create_domain(client, "b.com")
+        await create_domain(client, "c.com")
+        first = await publish(session_factory, zone_path, state_path)
+
+        unchanged = await publish(session_factory, zone_path, state_path, tmp_path / "noop.txt")
+
+        await client.patch(f"/admin/domains/{revoke_id}/revoke", headers=ADMIN_HEADERS)
+        await client.delete(f"/admin/domains/{delete_id}", headers=ADMIN_HEADERS)
+        await create_domain(client, "d.com")
+        second = await publish(session_factory, zone_path, state_path, tmp_path / "update.txt")
+
+    assert (unchanged["added"], unchanged["changed"], unchanged["removed"]) == (0, 0, 0)
+    assert "update" not in (tmp_path / "noop.txt").read_text()
+    assert second["serial"] > unchanged["serial"] > first["serial"]
+    assert (second["added"], second["changed"], second["removed"]) == (1, 1, 1)
+
+    zone = load_zone(zone_path)
+    assert zone.find_rdataset("@", "SOA")[0].serial == second["serial"]
+    assert zone.get_node("b.com") is None
+    assert txt_fields(zone, "a.com")["s"] == "revoked"
+    assert txt_fields(zone, "d.com")["s"] == "active"
+
+    script = (tmp_path / "update.txt").read_text().splitlines()
+    assert script[1] == f"zone {settings.dns_zone}"
+    assert f"update delete {fqdn('b.com')} TXT" in script
+    assert any(line.startswith(f"update add {fqdn('a.com')} {settings.dns_ttl} TXT") for line in script)
+    assert any(line.startswith(f"update add {fqdn('d.com')} ") for line in script)
+    assert not any(fqdn("c.com") in line for line in script)
+    assert script[-1] == "send"
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_rerenders_lapsed_and_missing_records(session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(dns_publisher, "YIELD_PER", 1)  # interleave fetches from both streams
+    zone_path, state_path = tmp_path / "z.zone", tmp_path / "state.json"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await create_domain(client, "lapsed.com")
+        await create_domain(client, "lost.com")
+        await create_domain(client, "same.com")
+    await publish(session_factory, zone_path, state_path)
+
+    # Lapses without touching updated_at, as before the expiry sweeper runs
+    async with session_factory() as session:
+        await session.execute(
+            update(Domain)
+            .where(Domain.domain_name == "lapsed.com")
+            .values(expires_at=datetime.now(timezone.utc) - timedelta(hours=1), updated_at=Domain.updated_at)
+        )
+        await session.commit()
+    # An old row the previous zone does not have
+    zone_path.write_text("".join(l for l in zone_path.open() if not l.startswith("lost.com ")))
+
+    counts = await publish(session_factory, zone_path, state_path)
+    zone = load_zone(zone_path)
+
+    assert (counts["added"], counts["changed"], counts["removed"]) == (1, 1, 0)
+    assert txt_fields(zone, "lapsed.com")["s"] == "expired"
+    assert txt_fields(zone, "lost.com")["s"] == "active"
+    assert txt_fields(zone, "same.com")["s"] == "active"
@@ -0,0 +1,100 @@
+"""
+test_expiry.py — expires_at on records, /verify reporting and the expiry sweeper.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+
+from app.main import app
+from app.cache import verify_cache
+from app.crypto import sign_domain
+from app.expiry import expire_due
+from app.models import Domain, DomainChange, WebhookOutbox
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+
+async def insert_signed(session_factory, name: str, expires_at: datetime | None) -> None:
+    """Insert a record directly, as if it had been issued in the past."""
+    issued_at = datetime.now(timezone.utc) - timedelta(days=365)
+    signature, public_key = sign_domain(name, "active", "basic", issued_at, expires_at)
+    async with session_factory() as session:
+        session.add(Domain(
+            domain_name=name,
+            status="active",
+            compliance_level="basic",
+            issued_at=issued_at,
+            expires_at=expires_at,
+            signature=signature,
+            public_key=public_key,
+        ))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_create_with_expiry_is_signed_and_reported():
+    expires_at = datetime.now(timezone.utc) + timedelta(days=30)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await create_domain(client, "expiring.com", expires_at=expires_at.isoformat())
+        r = await client.get("/verify?domain=expiring.com")
+    assert r.json()["status"] == "active"
+    assert r.json()["expires_at"] is not None
+    assert r.json()["signature_valid"] is True
+
+
+@pytest.mark.asyncio
+async def test_create_rejects_past_expiry():
+    past = datetime.now(timezone.utc) - timedelta(minutes=1)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.post(
+            "/admin/domains",
+            json={"domain_name": "stale.com", "compliance_level": "basic", "expires_at": past.isoformat()},
+            headers=ADMIN_HEADERS,
+        )
+    assert r.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_verify_reports_expired_before_sweep(session_factory):
+    await insert_signed(session_factory, "lapsed.com", datetime.now(timezone.utc) - timedelta(hours=1))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.get("/verify?domain=lapsed.com")
+    assert r.json()["status"] == "expired"
+    assert r.json()["signature_valid"] is True
+
+
+@pytest.mark.asyncio
+async def test_sweeper_expires_due_records_in_batches(session_factory):
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    for name in ("due-1.com", "due-2.com", "due-3.com"):
+        await insert_signed(session_factory, name, past)
+    await insert_signed(session_factory, "future.com", datetime.now(timezone.utc) + timedelta(days=1))
+    await insert_signed(session_factory, "forever.com", None)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post(
+            "/admin/webhooks",
+            json={"url": "http://partner.test/hook", "events": ["domain.expired"]},
+            headers=ADMIN_HEADERS,
+        )
+    verify_cache.set("due-1.com", object())
+
+    assert await expire_due(session_factory, batch_size=2) == 3
+    assert await expire_due(session_factory, batch_size=2) == 0
+
+    async with session_factory() as session:
+        statuses = dict((await session.execute(select(Domain.domain_name, Domain.status))).all())
+        outbox = (await session.execute(select(WebhookOutbox))).scalars().all()
+        changes = (await session.execute(select(DomainChange.domain_name))).scalars().all()
+    assert statuses == {
+        "due-1.com": "expired", "due-2.com": "expired", "due-3.com": "expired",
+        "future.com": "active", "forever.com": "active",
+    }
+    # Same side effects as a manual revoke: webhook events, change broadcast, cache eviction
+    assert sorted(json.loads(row.payload)["data"]["domain"] for row in outbox) == ["due-1.com", "due-2.com", "due-3.com"]
+    assert all(json.loads(row.payload)["data"]["status"] == "expired" for row in outbox)
+    assert sorted(changes) == ["due-1.com", "due-2.com", "due-3.com"]
+    assert verify_cache.get("due-1.com") is None
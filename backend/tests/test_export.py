@@ -0,0 +1,64 @@
+"""
+test_export.py — Streaming NDJSON / CSV export of domain records.
+"""
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app import export
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+
+async def seed(client: AsyncClient) -> None:
+    for name, level in (("a.com", "basic"), ("b.com", "advanced"), ("c.com", "basic")):
+        domain_id = await create_domain(client, name, level)
+        if name == "c.com":
+            await client.patch(f"/admin/domains/{domain_id}/revoke", headers=ADMIN_HEADERS)
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_every_record(monkeypatch):
+    monkeypatch.setattr(export, "YIELD_PER", 2)  # force several cursor partitions
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await seed(client)
+        r = await client.get("/admin/domains/export", headers=ADMIN_HEADERS)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in r.text.splitlines()]
+    assert [rec["domain_name"] for rec in records] == ["a.com", "b.com", "c.com"]
+    assert records[2]["revoked_at"].endswith("Z")
+    assert records[0]["revoked_at"] is None
+
+
+@pytest.mark.asyncio
+async def test_export_applies_list_filters():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await seed(client)
+        exported = await client.get(
+            "/admin/domains/export?status=active&compliance_level=basic", headers=ADMIN_HEADERS
+        )
+        listed = await client.get(
+            "/admin/domains?status=active&compliance_level=basic", headers=ADMIN_HEADERS
+        )
+    assert [json.loads(line)["domain_name"] for line in exported.text.splitlines()] == ["a.com"]
+    assert listed.json()["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_export_csv_gzip():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await seed(client)
+        async with client.stream(
+            "GET", "/admin/domains/export?format=csv&gzip=true", headers=ADMIN_HEADERS
+        ) as r:
+            raw = b"".join([chunk async for chunk in r.aiter_raw()])
+    assert r.headers["content-encoding"] == "gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(raw).decode())))
+    assert [row["domain_name"] for row in rows] == ["a.com", "b.com", "c.com"]
+    assert rows[2]["status"] == "revoked"
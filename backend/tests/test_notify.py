@@ -0,0 +1,75 @@
+"""
+test_notify.py — Cross-worker cache invalidation through the change log (SQLite fallback).
+"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, select
+
+from app.main import app
+from app.cache import verify_cache
+from app.models import DomainChange
+from app.notify import PollingChangeListener
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_written_to_change_log(session_factory):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        domain_id = await create_domain(client, "logged.com")
+        await client.patch(f"/admin/domains/{domain_id}/revoke", headers=ADMIN_HEADERS)
+
+    async with session_factory() as session:
+        names = (await session.execute(select(DomainChange.domain_name))).scalars().all()
+    assert names == ["logged.com", "logged.com"]
+
+
+@pytest.mark.asyncio
+async def test_poller_evicts_entries_changed_by_another_worker(session_factory):
+    listener = PollingChangeListener(session_factory, interval=1.0)
+    assert await listener.poll_once() == 0  # establishes the starting point
+
+    # Stand-in for an entry this worker cached before another worker revoked the domain
+    verify_cache.set("other-worker.com", object())
+    async with session_factory() as session:
+        session.add(DomainChange(domain_name="other-worker.com"))
+        await session.commit()
+
+    assert await listener.poll_once() == 1
+    assert verify_cache.get("other-worker.com") is None
+    assert await listener.poll_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_poller_sees_changes_after_the_log_was_pruned(session_factory):
+    listener = PollingChangeListener(session_factory, interval=1.0)
+    await listener.poll_once()
+    async with session_factory() as session:
+        session.add_all(DomainChange(domain_name=f"old{i}.com") for i in range(5))
+        await session.commit()
+    assert await listener.poll_once() == 5
+
+    # Retention prune empties the table: not a restart, so the cache is kept
+    async with session_factory() as session:
+        await session.execute(delete(DomainChange))
+        await session.commit()
+    verify_cache.set("kept.com", object())
+    assert await listener.poll_once() == 0
+    assert verify_cache.get("kept.com") is not None
+
+    # The next change must still be seen
+    async with session_factory() as session:
+        session.add(DomainChange(domain_name="pruned.com"))
+        await session.commit()
+    verify_cache.set("pruned.com", object())
+    assert await listener.poll_once() == 1
+    assert verify_cache.get("pruned.com") is None
+
+    # Ids restarting below the last seen one (e.g. a rebuilt table) clear the cache
+    async with session_factory() as session:
+        await session.execute(delete(DomainChange))
+        session.add(DomainChange(id=1, domain_name="restarted.com"))
+        await session.commit()
+    verify_cache.set("unrelated.com", object())
+    assert await listener.poll_once() == 1
+    assert verify_cache.get("unrelated.com") is None
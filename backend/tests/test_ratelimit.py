@@ -0,0 +1,95 @@
+"""
+test_ratelimit.py — Token buckets and admission control on /verify.
+"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app import ratelimit
+from app.ratelimit import ConcurrencyLimiter, InMemoryRateLimitBackend
+
+
+@pytest.mark.asyncio
+async def test_bucket_admits_burst_then_reports_wait():
+    backend = InMemoryRateLimitBackend()
+    for _ in range(3):
+        assert await backend.acquire("k", rate=1.0, burst=3) == 0.0
+    wait = await backend.acquire("k", rate=1.0, burst=3)
+    assert 0.0 < wait <= 1.0
+    # Other keys have their own bucket
+    assert await backend.acquire("other", rate=1.0, burst=3) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_bucket_evicts_least_recent_key():
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    await backend.acquire("a", rate=1.0, burst=1)
+    await backend.acquire("b", rate=1.0, burst=1)
+    await backend.acquire("c", rate=1.0, burst=1)
+    # "a" was evicted, so it starts again with a full bucket
+    assert await backend.acquire("a", rate=1.0, burst=1) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_verify_returns_429_when_bucket_empty(monkeypatch):
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_burst", 2.0)
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_per_second", 0.5)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        codes = [(await client.get("/verify?domain=nope.com")).status_code for _ in range(2)]
+        r = await client.get("/verify?domain=nope.com")
+    assert codes == [404, 404]
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_known_api_token_gets_its_own_bucket(monkeypatch):
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_burst", 1.0)
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_per_second", 0.1)
+    monkeypatch.setattr(ratelimit, "_api_tokens", frozenset({"scanner-1"}))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/verify?domain=nope.com")
+        anonymous = await client.get("/verify?domain=nope.com")
+        tokened = await client.get("/verify?domain=nope.com", headers={"X-API-Token": "scanner-1"})
+        unknown = await client.get("/verify?domain=nope.com", headers={"X-API-Token": "made-up"})
+    assert anonymous.status_code == 429
+    assert tokened.status_code == 404
+    assert unknown.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_verify_sheds_load_with_503_when_saturated(monkeypatch):
+    limiter = ConcurrencyLimiter(limit=1, timeout=0.01)
+    monkeypatch.setattr(ratelimit, "verify_concurrency", limiter)
+    assert await limiter.acquire()  # occupy the only slot
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            r = await client.get("/verify?domain=nope.com")
+    finally:
+        limiter.release()
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_bucket_admits_cost_above_burst_into_debt():
+    backend = InMemoryRateLimitBackend()
+    assert await backend.acquire("k", rate=1.0, burst=3, cost=5) == 0.0
+    # Two tokens of debt plus one for the next request
+    assert await backend.acquire("k", rate=1.0, burst=3) > 2.0
+
+
+@pytest.mark.asyncio
+async def test_batches_are_charged_per_distinct_domain(monkeypatch):
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_burst", 5.0)
+    monkeypatch.setattr(ratelimit.settings, "rate_limit_per_second", 0.1)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        oversized = await client.post("/verify/batch", json={"domains": ["x.com"] * 101})
+        first = await client.post("/verify/batch", json={"domains": ["a.com", "b.com", "c.com", "a.com"]})
+        second = await client.post("/staple/batch", json={"domains": ["d.com", "e.com"]})
+        single = await client.get("/verify?domain=a.com")
+    # The oversized batch spent nothing; the other two spent all 5 tokens
+    assert oversized.status_code == 422
+    assert first.status_code == 200 and second.status_code == 200
+    assert single.status_code == 429
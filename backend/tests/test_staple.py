@@ -0,0 +1,82 @@
+"""
+test_staple.py — Stapled status tokens: format, issuance endpoints and caching.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.config import get_settings
+from app.staple import encode_token, verify_token
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+settings = get_settings()
+
+
+def test_token_round_trip_and_rejection():
+    now = datetime.now(timezone.utc)
+    claims = {"d": "example.com", "s": "active", "l": "basic", "iat": int(now.timestamp()), "exp": int(now.timestamp()) + 60}
+    token = encode_token(claims)
+    assert verify_token(token) == claims
+
+    payload, signature = token.split(".")
+    forged = encode_token({**claims, "d": "attacker.com"}).split(".")[0] + "." + signature
+    with pytest.raises(ValueError):
+        verify_token(forged)
+    with pytest.raises(ValueError):
+        verify_token(payload)
+    with pytest.raises(ValueError):
+        verify_token(token, now=now + timedelta(minutes=2))
+
+
+@pytest.mark.asyncio
+async def test_staple_is_verifiable_with_published_key():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await create_domain(client, "stapled.com")
+        r = await client.get("/staple?domain=stapled.com")
+        key = await client.get("/public-key")
+        unknown = await client.get("/staple?domain=unknown.com")
+
+    assert r.status_code == 200
+    assert "max-age=" in r.headers["cache-control"]
+    claims = verify_token(r.json()["token"], key.json()["public_key"])
+    assert claims["d"] == "stapled.com"
+    assert claims["s"] == r.json()["status"] == "active"
+    assert claims["exp"] - claims["iat"] == int(settings.staple_ttl)
+    assert unknown.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_staple_is_cached_until_the_domain_changes():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        domain_id = await create_domain(client, "cached.com")
+        first = await client.get("/staple?domain=cached.com")
+        second = await client.get("/staple?domain=cached.com")
+        await client.patch(f"/admin/domains/{domain_id}/revoke", headers=ADMIN_HEADERS)
+        after_revoke = await client.get("/staple?domain=cached.com")
+
+    assert first.json()["token"] == second.json()["token"]
+    assert after_revoke.json()["status"] == "revoked"
+    assert verify_token(after_revoke.json()["token"])["s"] == "revoked"
+
+
+@pytest.mark.asyncio
+async def test_batch_staple():
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await create_domain(client, "a.com")
+        await create_domain(client, "b.com", expires_at=expires_at.isoformat())
+        r = await client.post("/staple/batch", json={"domains": ["a.com", "b.com", "nope.com", "a.com"]})
+        too_many = await client.post(
+            "/staple/batch", json={"domains": [f"d{i}.com" for i in range(settings.staple_batch_max + 1)]}
+        )
+
+    assert r.status_code == 200
+    tokens = {item["domain"]: verify_token(item["token"]) for item in r.json()["tokens"]}
+    assert sorted(tokens) == ["a.com", "b.com"]
+    assert r.json()["missing"] == ["nope.com"]
+    # A token never outlives the record it attests
+    assert tokens["b.com"]["exp"] == int(expires_at.timestamp())
+    assert too_many.status_code == 422
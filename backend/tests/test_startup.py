@@ -0,0 +1,59 @@
+"""
+test_startup.py — Warm-up, readiness and the verify cache.
+"""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete
+
+from app.main import app
+from app.cache import verify_cache
+from app.models import Domain
+from app.startup import check_schema_revision, preload_verify_cache, readiness, warm_up
+from tests.conftest import ADMIN_HEADERS, create_domain
+
+
+@pytest.mark.asyncio
+async def test_ready_returns_503_until_warm_up_finishes(db_engine, session_factory):
+    readiness.reset()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        before = await client.get("/ready")
+        await warm_up(db_engine, session_factory)
+        after = await client.get("/ready")
+    assert before.status_code == 503
+    assert after.status_code == 200
+    assert after.json()["status"] == "ready"
+
+
+@pytest.mark.asyncio
+async def test_preloaded_domain_is_served_from_cache(session_factory):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await create_domain(client, "warm.com")
+        assert await preload_verify_cache(session_factory, limit=10) == 1
+
+        # Remove the row behind the cache's back: the answer must come from memory
+        async with session_factory() as session:
+            await session.execute(delete(Domain))
+            await session.commit()
+        r = await client.get("/verify?domain=warm.com")
+    assert r.status_code == 200
+    assert r.json()["signature_valid"] is True
+
+
+@pytest.mark.asyncio
+async def test_revoke_evicts_cached_verify_response():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        domain_id = await create_domain(client, "evict.com")
+        first = await client.get("/verify?domain=evict.com")
+        assert verify_cache.get("evict.com") is not None
+        await client.patch(f"/admin/domains/{domain_id}/revoke", headers=ADMIN_HEADERS)
+        second = await client.get("/verify?domain=evict.com")
+    assert first.json()["status"] == "active"
+    assert second.json()["status"] == "revoked"
+
+
+@pytest.mark.asyncio
+async def test_schema_check_rejects_unmigrated_database(db_engine):
+    # Tests build tables with create_all, so there is no alembic_version stamp
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        await check_schema_revision(db_engine)
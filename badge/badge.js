@@ -11,6 +11,14 @@
  *     src="https://your-api.com/badge/badge.js"
  *     data-api="https://your-api.com">
  *   </script>
+ *
+ * Stapled mode (no /verify call per page view): the domain owner refreshes
+ * a token from GET /staple?domain=... and embeds it:
+ *   <div data-domain="example.com" data-token="eyJk..."></div>
+ * The token is verified in the browser with WebCrypto Ed25519. If it is
+ * missing, expired, for another domain, or cannot be verified, the badge
+ * falls back to /verify. The public key is read once from GET /public-key
+ * on the origin that served this script, never from the embedding page.
  */
 (function () {
   'use strict';
@@ -22,10 +30,12 @@
     'border:1.5px solid;transition:opacity .2s;}',
     '.cs-badge--active{background:rgba(16,185,129,.12);color:#10b981;border-color:rgba(16,185,129,.3);}',
     '.cs-badge--revoked{background:rgba(239,68,68,.12);color:#ef4444;border-color:rgba(239,68,68,.3);}',
+    '.cs-badge--expired{background:rgba(245,158,11,.12);color:#f59e0b;border-color:rgba(245,158,11,.3);}',
     '.cs-badge--unknown{background:rgba(107,114,128,.12);color:#6b7280;border-color:rgba(107,114,128,.3);}',
     '.cs-badge-dot{width:7px;height:7px;border-radius:50%;flex-shrink:0;}',
     '.cs-badge--active .cs-badge-dot{background:#10b981;animation:cs-pulse 2s infinite;}',
     '.cs-badge--revoked .cs-badge-dot{background:#ef4444;}',
+    '.cs-badge--expired .cs-badge-dot{background:#f59e0b;}',
     '.cs-badge--unknown .cs-badge-dot{background:#6b7280;}',
     '@keyframes cs-pulse{0%,100%{opacity:1;}50%{opacity:.4;}}'
   ].join('');
@@ -40,18 +50,96 @@
 
   function getApiBase() {
     // Allow override via script tag: <script src="..." data-api="https://...">
+    var api = getScriptAttribute('data-api');
+    if (api) return api.replace(/\/$/, '');
+    // Default: same origin
+    return '';
+  }
+
+  // Captured while the script runs: currentScript is null in callbacks
+  var SCRIPT_SRC = (function () {
+    if (document.currentScript && document.currentScript.src) return document.currentScript.src;
     var scripts = document.getElementsByTagName('script');
-    for (var i = 0; i < scripts.length; i++) {
-      var api = scripts[i].getAttribute('data-api');
-      if (api) return api.replace(/\/$/, '');
+    for (var i = scripts.length - 1; i >= 0; i--) {
+      if (/\/badge\.js(?:[?#]|$)/.test(scripts[i].src)) return scripts[i].src;
     }
-    // Default: same origin
     return '';
+  })();
+
+  function getKeyBase() {
+    // Trust the signing key only from the API that served this script;
+    // data-api is set by the embedding page and could point anywhere
+    return SCRIPT_SRC ? new URL(SCRIPT_SRC).origin : '';
+  }
+
+  function getScriptAttribute(name) {
+    var scripts = document.getElementsByTagName('script');
+    for (var i = 0; i < scripts.length; i++) {
+      var value = scripts[i].getAttribute(name);
+      if (value) return value;
+    }
+    return null;
+  }
+
+  // ─── Stapled tokens ────────────────────────────────────────────────────────
+
+  function hexToBytes(hex) {
+    var bytes = new Uint8Array(hex.length / 2);
+    for (var i = 0; i < bytes.length; i++) {
+      bytes[i] = parseInt(hex.substr(i * 2, 2), 16);
+    }
+    return bytes;
+  }
+
+  function base64UrlToBytes(segment) {
+    var b64 = segment.replace(/-/g, '+').replace(/_/g, '/');
+    while (b64.length % 4) b64 += '=';
+    var raw = atob(b64);
+    var bytes = new Uint8Array(raw.length);
+    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return bytes;
+  }
+
+  var publicKeyPromise = null;
+
+  function getPublicKey() {
+    if (!publicKeyPromise) {
+      publicKeyPromise = fetch(getKeyBase() + '/public-key').then(function (r) {
+        if (!r.ok) throw new Error('public key unavailable');
+        return r.json();
+      }).then(function (data) {
+        return crypto.subtle.importKey('raw', hexToBytes(data.public_key), { name: 'Ed25519' }, false, ['verify']);
+      });
+    }
+    return publicKeyPromise;
+  }
+
+  // Resolves to the token claims, or rejects if the token is not acceptable
+  function verifyToken(token, domain) {
+    if (!window.crypto || !crypto.subtle || !window.Promise) {
+      return Promise.reject(new Error('WebCrypto unavailable'));
+    }
+    var parts = token.split('.');
+    if (parts.length !== 2) return Promise.reject(new Error('malformed token'));
+    return getPublicKey().then(function (key) {
+      return crypto.subtle.verify(
+        { name: 'Ed25519' }, key, base64UrlToBytes(parts[1]), new TextEncoder().encode(parts[0])
+      );
+    }).then(function (valid) {
+      if (!valid) throw new Error('bad signature');
+      var claims = JSON.parse(new TextDecoder().decode(base64UrlToBytes(parts[0])));
+      if (claims.d !== domain) throw new Error('token issued for another domain');
+      if (claims.exp * 1000 <= Date.now()) throw new Error('token expired');
+      return claims;
+    });
   }
 
   function renderBadge(container, state, domain) {
-    var modifier = state === 'active' ? 'active' : state === 'revoked' ? 'revoked' : 'unknown';
-    var label = state === 'active' ? '✓ Compliant — Active' : state === 'revoked' ? '✗ Revoked' : '? Unknown';
+    var modifier = state === 'active' || state === 'revoked' || state === 'expired' ? state : 'unknown';
+    var label = state === 'active' ? '✓ Compliant — Active'
+      : state === 'revoked' ? '✗ Revoked'
+      : state === 'expired' ? '⌛ Expired'
+      : '? Unknown';
 
     var badge = document.createElement('span');
     badge.className = 'cs-badge cs-badge--' + modifier;
@@ -96,6 +184,14 @@
     xhr.send();
   }
 
+  function renderStapled(container, domain, token, apiBase) {
+    verifyToken(token, domain).then(function (claims) {
+      renderBadge(container, claims.s, domain);
+    }, function () {
+      fetchAndRender(container, domain, apiBase);
+    });
+  }
+
   function init() {
     injectStyle();
     var apiBase = getApiBase();
@@ -105,7 +201,12 @@
       var domain = container.getAttribute('data-domain');
       if (domain) {
         renderBadge(container, 'loading', domain);
-        fetchAndRender(container, domain, apiBase);
+        var token = container.getAttribute('data-token');
+        if (token) {
+          renderStapled(container, domain, token, apiBase);
+        } else {
+          fetchAndRender(container, domain, apiBase);
+        }
       }
     }
   }
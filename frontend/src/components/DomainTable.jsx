@@ -11,6 +11,14 @@ function StatusBadge({ status }) {
             </span>
         )
     }
+    if (status === 'expired') {
+        return (
+            <span className="inline-flex items-center gap-1.5 px-2.5 py-1 rounded-full text-xs font-medium bg-amber-500/15 text-amber-400 border border-amber-500/20">
+                <span className="w-1.5 h-1.5 rounded-full bg-amber-400" />
+                Expired
+            </span>
+        )
+    }
     return (
         <span className="inline-flex items-center gap-1.5 px-2.5 py-1 rounded-full text-xs font-medium bg-red-500/15 text-red-400 border border-red-500/20">
             <span className="w-1.5 h-1.5 rounded-full bg-red-400" />